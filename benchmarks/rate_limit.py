@@ -0,0 +1,53 @@
+"""Measure the per check latency of the rate limiter for each storage.
+
+    pdm run python benchmarks/rate_limit.py --checks 10000 --clients 100
+"""
+
+import argparse
+import time
+
+from limits import parse, storage, strategies
+
+from yt_thumbsense.config import get_settings
+
+settings = get_settings()
+
+
+def check_latencies(
+    storage_uri: str, strategy: str, checks: int, clients: int
+) -> list[float]:
+    limiter = strategies.STRATEGIES[strategy](
+        storage.storage_from_string(
+            storage_uri,
+            socket_timeout=settings.rate_limit_storage_timeout_seconds,
+            socket_connect_timeout=settings.rate_limit_storage_timeout_seconds,
+        )
+    )
+    limit = parse(settings.rate_limits[0])
+    latencies = []
+    for check in range(checks):
+        start = time.perf_counter()
+        limiter.hit(limit, "benchmark", f"client-{check % clients}")
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checks", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--strategy", default=settings.rate_limit_strategy)
+    args = parser.parse_args()
+
+    for storage_uri in (
+        "memory://",
+        settings.rate_limit_storage_uri or settings.redis_url,
+    ):
+        latencies = check_latencies(
+            storage_uri, args.strategy, args.checks, args.clients
+        )
+        print(
+            f"{storage_uri}: "
+            f"p50 {latencies[len(latencies) // 2] * 1e6:.1f}us, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.1f}us per check"
+        )
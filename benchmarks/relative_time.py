@@ -0,0 +1,62 @@
+"""Compare dateparser with the relative time parser on the times of YouTube comments.
+
+    pdm run python benchmarks/relative_time.py --comments 1000
+    pdm run python benchmarks/relative_time.py --corpus times.txt
+"""
+
+import argparse
+import random
+import time
+
+import dateparser
+
+from yt_thumbsense.relative_time import parse_relative_time
+
+SAMPLE_TIMES = [
+    "5 minutes ago",
+    "1 hour ago",
+    "3 hours ago",
+    "1 day ago",
+    "6 days ago",
+    "2 weeks ago",
+    "1 month ago (edited)",
+    "7 months ago",
+    "1 year ago",
+    "3 years ago (edited)",
+]
+
+
+def with_dateparser(times: list[str]) -> float:
+    start = time.perf_counter()
+    for text in times:
+        dateparser.parse(text.replace("(edited)", ""))
+    return time.perf_counter() - start
+
+
+def with_relative_time_parser(times: list[str]) -> float:
+    start = time.perf_counter()
+    for text in times:
+        parse_relative_time(text)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=1000)
+    parser.add_argument("--corpus", help="File with one recorded comment time per line")
+    args = parser.parse_args()
+
+    if args.corpus is not None:
+        with open(args.corpus, encoding="utf-8") as corpus_file:
+            times = [line.strip() for line in corpus_file if line.strip()]
+    else:
+        times = random.choices(SAMPLE_TIMES, k=args.comments)
+
+    for name, elapsed in (
+        ("dateparser", with_dateparser(times)),
+        ("relative time parser", with_relative_time_parser(times)),
+    ):
+        print(
+            f"{name}: {elapsed:.3f}s total, "
+            f"{elapsed / len(times) * 1e6:.1f}us per comment"
+        )
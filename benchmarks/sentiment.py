@@ -0,0 +1,63 @@
+"""Compare the per comment cost of creating a VADER analyzer per comment with the
+shared sentiment engine.
+
+    pdm run python benchmarks/sentiment.py --comments 1000
+"""
+
+import argparse
+import random
+import time
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from yt_thumbsense.sentiment import get_analyzer, score_batch
+
+SAMPLE_COMMENTS = [
+    "This is the best video I have seen in a long time!",
+    "I don't like how this ended :(",
+    "lol",
+    "Great explanation, thank you so much",
+    "Worst tutorial ever, nothing works",
+    "first",
+    "The audio is a bit low but the content is AMAZING 😍",
+    "meh",
+]
+
+
+def per_comment_analyzer(comments: list[str]) -> float:
+    start = time.perf_counter()
+    for comment in comments:
+        SentimentIntensityAnalyzer().polarity_scores(comment)
+    return time.perf_counter() - start
+
+
+def sentiment_engine(comments: list[str], batch_size: int) -> float:
+    start = time.perf_counter()
+    get_analyzer()
+    for batch_start in range(0, len(comments), batch_size):
+        score_batch(comments[batch_start : batch_start + batch_size])
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    # Number the comments so the memoization of repeated texts doesn't skew results
+    comments = [
+        f"{comment} #{index}"
+        for index, comment in enumerate(
+            random.choices(SAMPLE_COMMENTS, k=args.comments)
+        )
+    ]
+
+    for name, elapsed in (
+        ("analyzer per comment", per_comment_analyzer(comments)),
+        ("sentiment engine", sentiment_engine(comments, args.batch_size)),
+    ):
+        print(
+            f"{name}: {elapsed:.3f}s total, "
+            f"{elapsed / args.comments * 1e6:.1f}us per comment"
+        )
@@ -0,0 +1,67 @@
+"""Compare the cost of serializing a page of comments through the response model
+with the compact responses.
+
+    pdm run python benchmarks/serialization.py --comments 1000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from yt_thumbsense.models.comment import CommentItem
+from yt_thumbsense.responses import compact_response, parse_fields
+
+
+def validated(comments: list[dict], repeat: int) -> float:
+    # What FastAPI does with a response_model
+    adapter = TypeAdapter(list[CommentItem])
+    start = time.perf_counter()
+    for _ in range(repeat):
+        json.dumps(jsonable_encoder(adapter.validate_python(comments))).encode()
+    return (time.perf_counter() - start) / repeat
+
+
+def compact(comments: list[dict], fields: str | None, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        compact_response(comments, parse_fields(fields, CommentItem))
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    current_time = datetime.now()
+    comments = [
+        {
+            "video_id": "A1b2C3d4EfG",
+            "comment_id": f"comment{index}",
+            "comment_parent_id": None,
+            "text": "The audio is a bit low but the content is AMAZING " * 4,
+            "votes": index,
+            "replies": 0,
+            "time_posted": current_time,
+            "status": "processed",
+            "created_at": current_time.isoformat(),
+            "updated_at": current_time.isoformat(),
+            "vader_sentiment": {"neg": 0.1, "neu": 0.5, "pos": 0.4, "compound": 0.6},
+        }
+        for index in range(args.comments)
+    ]
+
+    for name, elapsed in (
+        ("response model", validated(comments, args.repeat)),
+        ("compact", compact(comments, None, args.repeat)),
+        (
+            "compact comment_id,vader_sentiment",
+            compact(comments, "comment_id,vader_sentiment", args.repeat),
+        ),
+    ):
+        print(f"{name}: {elapsed * 1e3:.2f}ms per page of {args.comments} comments")
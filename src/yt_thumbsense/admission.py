@@ -0,0 +1,76 @@
+import math
+
+from loguru import logger
+from redis import RedisError
+
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.metrics import get_queue_wait_seconds, get_throughput
+from yt_thumbsense.worker import ingestion_queue, interactive_queue, sentiment_queue
+
+settings = get_settings()
+
+# Queues a requested video waits on before its score is available, the background
+# queue runs after them and doesn't delay requests
+ADMISSION_QUEUES = [interactive_queue, ingestion_queue, sentiment_queue]
+
+
+def get_admission_backlog() -> int:
+    return sum(queue.count for queue in ADMISSION_QUEUES)
+
+
+def get_admission_wait_seconds() -> float:
+    return max(get_queue_wait_seconds(queue) for queue in ADMISSION_QUEUES)
+
+
+def _workers_saturated() -> bool:
+    """Whether jobs kept waiting on the admission queues over the whole throughput
+    window, i.e. the throughput observed is what the workers can do rather than
+    what was asked of them."""
+    try:
+        wait_seconds = get_admission_wait_seconds()
+    except RedisError as e:
+        logger.warning(f"Error reading the queue wait: {e}")
+        return False
+    return wait_seconds >= settings.admission_throughput_window_seconds
+
+
+def admission_retry_after() -> int | None:
+    """Check whether the workers can take a new video.
+
+    A video is admitted while the jobs ahead of it stay under
+    `admission_max_queue_depth` and can be drained within
+    `admission_max_drain_seconds`. The drain time is only checked while the workers
+    are saturated, idle workers finish few jobs and their throughput says nothing
+    about how fast they could go. Admission fails open when Redis can't be read.
+
+    Returns:
+        None if the video is admitted, otherwise the number of seconds after which
+        the client should retry.
+    """
+    try:
+        backlog = get_admission_backlog()
+    except RedisError as e:
+        logger.warning(f"Error reading the queue backlog, admitting request: {e}")
+        return None
+
+    max_backlog = settings.admission_max_queue_depth
+    throughput = get_throughput(settings.admission_throughput_window_seconds)
+    if throughput:
+        drain_backlog = math.floor(throughput * settings.admission_max_drain_seconds)
+        if backlog >= drain_backlog and _workers_saturated():
+            max_backlog = min(max_backlog, drain_backlog)
+    if backlog < max_backlog:
+        return None
+
+    if throughput:
+        # Time until the workers bring the backlog back under the threshold
+        retry_after = math.ceil((backlog - max_backlog + 1) / throughput)
+    else:
+        retry_after = settings.admission_max_drain_seconds
+    retry_after = min(max(retry_after, 1), settings.admission_max_retry_after_seconds)
+
+    logger.info(
+        f"Backlog of {backlog} job(s) over {max_backlog} at {throughput or 0:.2f} "
+        f"job(s)/s, retry after {retry_after}s"
+    )
+    return retry_after
@@ -5,4 +5,20 @@ from yt_thumbsense.config import get_settings
 
 settings = get_settings()
 
-limiter = Limiter(key_func=get_remote_address, default_limits=settings.rate_limits)
+# Limits are shared by every API process through Redis, where each check is a single
+# atomic script. When Redis can't answer within the timeout the limiter falls back to
+# per process in memory limits and only probes Redis again with a backoff, so a slow
+# or missing Redis never blocks or fails requests.
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=settings.rate_limits,
+    storage_uri=settings.rate_limit_storage_uri or settings.redis_url,
+    storage_options={
+        "socket_timeout": settings.rate_limit_storage_timeout_seconds,
+        "socket_connect_timeout": settings.rate_limit_storage_timeout_seconds,
+    },
+    strategy=settings.rate_limit_strategy,
+    key_prefix=settings.app_name,
+    in_memory_fallback_enabled=True,
+    swallow_errors=True,
+)
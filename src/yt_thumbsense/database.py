@@ -1,9 +1,53 @@
+import asyncio
+
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from yt_thumbsense.config import get_settings
 
+_client: AsyncIOMotorClient | None = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    """Return the process wide Motor client, creating it on first use.
+
+    Motor clients are bound to the event loop they are created on, so a new client
+    is created (and the previous one closed) when called from a different loop.
+    """
+    global _client
+
+    loop = asyncio.get_running_loop()
+    if _client is not None and _client.get_io_loop() is loop:
+        return _client
+
+    if _client is not None:
+        _client.close()
+
+    settings = get_settings()
+    _client = AsyncIOMotorClient(
+        settings.mongodb_uri,
+        io_loop=loop,
+        maxPoolSize=settings.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb_min_pool_size,
+        maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+        connectTimeoutMS=settings.mongodb_connect_timeout_ms,
+        serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+        socketTimeoutMS=settings.mongodb_socket_timeout_ms,
+    )
+    return _client
+
+
+async def connect_database():
+    get_client()
+
+
+async def close_database():
+    global _client
+
+    if _client is not None:
+        _client.close()
+        _client = None
+
 
 async def use_database():
     settings = get_settings()
-    client: AsyncIOMotorClient = AsyncIOMotorClient(settings.mongodb_url)
-    return client[settings.mongodb_db]
+    return get_client()[settings.mongodb_db]
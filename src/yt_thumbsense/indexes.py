@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import sys
+
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.database import close_database, use_database
+from yt_thumbsense.translation import TRANSLATIONS_COLLECTION
+
+settings = get_settings()
+
+REQUIRED_INDEXES: dict[str, list[IndexModel]] = {
+    "videos": [
+        IndexModel([("video_id", ASCENDING)], name="video_id_unique", unique=True),
+        IndexModel(
+            [("status", ASCENDING), ("updated_at", ASCENDING)],
+            name="status_updated_at",
+        ),
+        IndexModel([("claim_token", ASCENDING)], name="claim_token", sparse=True),
+    ],
+    "comments": [
+        IndexModel(
+            [("video_id", ASCENDING), ("comment_id", ASCENDING)],
+            name="video_id_comment_id_unique",
+            unique=True,
+        ),
+        IndexModel(
+            [("video_id", ASCENDING), ("status", ASCENDING)],
+            name="video_id_status",
+        ),
+        # Keyset pagination of the comments of a video
+        IndexModel([("video_id", ASCENDING), ("_id", ASCENDING)], name="video_id_id"),
+        IndexModel(
+            [("video_id", ASCENDING), ("votes", ASCENDING), ("_id", ASCENDING)],
+            name="video_id_votes_id",
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("lease_expires_at", ASCENDING)],
+            name="status_lease_expires_at",
+        ),
+        IndexModel([("claim_token", ASCENDING)], name="claim_token", sparse=True),
+    ],
+    "video_scores": [
+        IndexModel([("video_id", ASCENDING)], name="video_id_unique", unique=True),
+    ],
+    TRANSLATIONS_COLLECTION: [
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=settings.translation_cache_ttl_seconds,
+        ),
+    ],
+}
+
+
+def _index_key(index: dict) -> tuple:
+    key = index["key"]
+    # IndexModel documents hold the key as a mapping, index_information as pairs
+    if isinstance(key, dict):
+        key = key.items()
+    return tuple(
+        (field, int(direction) if isinstance(direction, float) else direction)
+        for field, direction in key
+    )
+
+
+async def _report_index_build_progress(
+    db: AsyncIOMotorDatabase, collection_name: str, interval_seconds: float
+):
+    """Periodically log the progress of the index builds running on a collection."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            current_operations = await db.client.admin.command(
+                {"currentOp": 1, "command.createIndexes": collection_name}
+            )
+        except Exception as e:
+            logger.debug(f"Unable to read index build progress: {e}")
+            return
+
+        for operation in current_operations.get("inprog", []):
+            progress = operation.get("progress", {})
+            if progress.get("total"):
+                logger.info(
+                    f"Building indexes on {collection_name}: "
+                    f"{progress.get('done', 0)}/{progress['total']} "
+                    f"({progress.get('done', 0) / progress['total']:.0%})"
+                )
+            else:
+                logger.info(
+                    f"Building indexes on {collection_name}: {operation.get('msg', '')}"
+                )
+
+
+async def ensure_indexes(
+    db: AsyncIOMotorDatabase, progress_interval_seconds: float = 10
+) -> list[str]:
+    """Create the indexes required by the application, if they don't exist yet.
+
+    Creating an index that already exists with the same definition is a no-op, so
+    this is safe to run on every startup.
+
+    Returns:
+        The names of the indexes that could not be created.
+    """
+    failed: list[str] = []
+
+    for collection_name, indexes in REQUIRED_INDEXES.items():
+        for index in indexes:
+            index_name = index.document["name"]
+            logger.info(f"Ensuring index {index_name} on {collection_name}")
+
+            progress_reporter = asyncio.create_task(
+                _report_index_build_progress(
+                    db, collection_name, progress_interval_seconds
+                )
+            )
+            try:
+                await db[collection_name].create_indexes([index])
+            except OperationFailure as e:
+                logger.error(
+                    f"Error creating index {index_name} on {collection_name}: {e}"
+                )
+                failed.append(index_name)
+            finally:
+                progress_reporter.cancel()
+
+    return failed
+
+
+async def check_indexes(db: AsyncIOMotorDatabase) -> list[str]:
+    """Compare the existing indexes with the required ones.
+
+    Returns:
+        Warnings about missing and redundant indexes.
+    """
+    warnings: list[str] = []
+
+    for collection_name, indexes in REQUIRED_INDEXES.items():
+        existing_indexes = await db[collection_name].index_information()
+        existing_keys = {
+            _index_key(index): bool(index.get("unique", False))
+            for index in existing_indexes.values()
+        }
+
+        for required_index in indexes:
+            required_key = _index_key(required_index.document)
+            if required_key not in existing_keys:
+                warnings.append(
+                    f"Missing index {required_index.document['name']} "
+                    f"on {collection_name}"
+                )
+            elif (
+                required_index.document.get("unique", False)
+                and not existing_keys[required_key]
+            ):
+                warnings.append(
+                    f"Index {required_index.document['name']} on {collection_name} "
+                    "exists but is not unique"
+                )
+
+        for index_name, index in existing_indexes.items():
+            key = _index_key(index)
+            if index_name == "_id_" or index.get("unique", False):
+                continue
+
+            covering_index = next(
+                (
+                    other_name
+                    for other_name, other_index in existing_indexes.items()
+                    if other_name != index_name
+                    and len(_index_key(other_index)) > len(key)
+                    and _index_key(other_index)[: len(key)] == key
+                ),
+                None,
+            )
+            if covering_index is not None:
+                warnings.append(
+                    f"Index {index_name} on {collection_name} is redundant, "
+                    f"it is a prefix of {covering_index}"
+                )
+
+    for warning in warnings:
+        logger.warning(warning)
+
+    return warnings
+
+
+async def main(check_only: bool = False) -> int:
+    db = await use_database()
+    try:
+        failed = [] if check_only else await ensure_indexes(db)
+        warnings = await check_indexes(db)
+    finally:
+        await close_database()
+
+    if failed or any(warning.startswith("Missing") for warning in warnings):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=f"Create and check the MongoDB indexes of {settings.app_name}"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check the existing indexes, don't create the missing ones",
+    )
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(check_only=args.check)))
@@ -0,0 +1,82 @@
+import hashlib
+from typing import Any, Callable
+
+from loguru import logger
+from rq import Queue
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.metrics import increment
+
+settings = get_settings()
+
+# Jobs in these states are still going to run, enqueueing them again is a no-op
+PENDING_JOB_STATUSES = {
+    JobStatus.QUEUED,
+    JobStatus.STARTED,
+    JobStatus.SCHEDULED,
+    JobStatus.DEFERRED,
+}
+
+ENQUEUE_LOCK_TTL_SECONDS = 10
+
+
+def start_job_id(video_id: str, generation: int) -> str:
+    return f"start:{video_id}:{generation}"
+
+
+def pull_job_id(video_id: str, generation: int) -> str:
+    return f"pull:{video_id}:{generation}"
+
+
+def sentiment_job_id(video_id: str, comment_ids: list[str]) -> str:
+    comments_hash = hashlib.sha256(
+        "\n".join(sorted(comment_ids)).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"sent:{video_id}:{comments_hash}"
+
+
+def is_job_pending(queue: Queue, job_id: str) -> bool:
+    """Whether the job with `job_id` is still queued or running, on any queue of the
+    connection of `queue`."""
+    try:
+        job = queue.job_class.fetch(
+            job_id, connection=queue.connection, serializer=queue.serializer
+        )
+    except NoSuchJobError:
+        return False
+    return job.get_status() in PENDING_JOB_STATUSES
+
+
+def enqueue_unique(
+    queue: Queue, job_id: str, func: Callable, *args: Any, **kwargs: Any
+) -> Job | None:
+    """Enqueue `func` under a deterministic `job_id`, unless a job with that ID is
+    already queued or running.
+
+    Returns:
+        The enqueued job, or None if it was a duplicate.
+    """
+    increment("jobs_enqueue_requests")
+
+    # Serialize concurrent enqueues of the same job between the check and the
+    # enqueue, the lock only has to outlive that window
+    lock_key = f"{settings.app_name}:enqueue_lock:{job_id}"
+    if not queue.connection.set(lock_key, 1, nx=True, ex=ENQUEUE_LOCK_TTL_SECONDS):
+        logger.debug(f"Job {job_id} is being enqueued concurrently, skipping")
+        increment("jobs_deduplicated")
+        return None
+
+    try:
+        existing_job = queue.fetch_job(job_id)
+        if existing_job is not None and existing_job.get_status() in (
+            PENDING_JOB_STATUSES
+        ):
+            logger.debug(f"Job {job_id} is already {existing_job.get_status()}")
+            increment("jobs_deduplicated")
+            return None
+
+        return queue.enqueue(func, *args, job_id=job_id, **kwargs)
+    finally:
+        queue.connection.delete(lock_key)
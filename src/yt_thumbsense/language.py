@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import re
+import sys
+from collections import Counter
+
+from loguru import logger
+
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.database import close_database, use_database
+
+_WORD_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+# Frequent English words that are rare in the other languages LibreTranslate
+# detects. Words shared with other latin languages ("a", "no", "me", "de", "is",
+# "was", "in", ...) and words used in every language on YouTube ("video") are left
+# out on purpose so they don't count as evidence.
+ENGLISH_WORDS = frozenset(
+    """
+    about after again all and any are aren't as at back be because been before being
+    best better but by can can't could did didn't do does doesn't doing don't down
+    even ever every for from get gets getting give go going gonna good got great has
+    hasn't have haven't he he's her here him his how i i'd i'll i'm i've if into
+    isn't it it's its just know like lol look love made make many more most much
+    must my never new nice not nothing now off oh ok okay one only or other our out
+    people really right said same say see she should some still such than thank
+    thanks that that's the their them then there there's these they they're thing
+    think this those through time to too up us very wasn't watch way we we're well
+    were what what's when where which while who why with without wow would wouldn't
+    yeah yes you you're your
+    """.split()
+)
+
+# Share of the words of an English text expected to be frequent words
+EXPECTED_ENGLISH_WORDS_RATIO = 0.4
+
+# Frequent words needed before a text is trusted as English at all
+MIN_ENGLISH_WORDS = 2
+
+# Share of non ASCII letters tolerated in an English text, e.g. "café"
+MAX_NON_ASCII_LETTERS_RATIO = 0.05
+
+settings = get_settings()
+
+
+def english_confidence(text: str) -> float:
+    """Estimate how confident we are that `text` is written in English.
+
+    The estimate is based on the share of frequent English words in the text,
+    texts written with non latin scripts or with too few words to tell score 0.
+
+    Returns:
+        A confidence between 0 and 1.
+    """
+    letters = [char for char in text if char.isalpha()]
+    if not letters:
+        return 0.0
+
+    non_ascii_letters = sum(1 for char in letters if not char.isascii())
+    if non_ascii_letters / len(letters) > MAX_NON_ASCII_LETTERS_RATIO:
+        return 0.0
+
+    words = _WORD_PATTERN.findall(text.lower().replace("’", "'"))
+    if not words:
+        return 0.0
+
+    english_words = sum(1 for word in words if word in ENGLISH_WORDS)
+    ratio_confidence = min(
+        english_words / len(words) / EXPECTED_ENGLISH_WORDS_RATIO, 1.0
+    )
+    evidence_confidence = min(english_words / MIN_ENGLISH_WORDS, 1.0)
+    return ratio_confidence * evidence_confidence
+
+
+def is_english(text: str, threshold: float | None = None) -> bool:
+    """Whether `text` is confidently English without asking LibreTranslate."""
+    if threshold is None:
+        threshold = settings.local_language_detection_threshold
+    return english_confidence(text) >= threshold
+
+
+def confusion_report(
+    texts: list[str], remote_languages: list[str | None], threshold: float
+) -> dict[str, int | float]:
+    """Compare the local English detection with the languages detected remotely.
+
+    Args:
+        texts: Sample corpus
+        remote_languages: Language detected by LibreTranslate for each text, or None
+            if it couldn't be detected
+        threshold: Local confidence threshold
+
+    Returns:
+        Counts of each (local, remote) outcome, the share of remote detections the
+        local detection saves and its precision.
+    """
+    outcomes: Counter[str] = Counter()
+    for text, remote_language in zip(texts, remote_languages):
+        if remote_language is None:
+            outcomes["remote_failed"] += 1
+            continue
+        local = "local_en" if is_english(text, threshold) else "local_deferred"
+        remote = "remote_en" if remote_language == "en" else "remote_other"
+        outcomes[f"{local}/{remote}"] += 1
+
+    local_english = outcomes["local_en/remote_en"] + outcomes["local_en/remote_other"]
+    compared = sum(outcomes.values()) - outcomes["remote_failed"]
+    return {
+        "local_en/remote_en": outcomes["local_en/remote_en"],
+        "local_en/remote_other": outcomes["local_en/remote_other"],
+        "local_deferred/remote_en": outcomes["local_deferred/remote_en"],
+        "local_deferred/remote_other": outcomes["local_deferred/remote_other"],
+        "remote_failed": outcomes["remote_failed"],
+        "skipped_detections": local_english / compared if compared else 0.0,
+        "precision": (
+            outcomes["local_en/remote_en"] / local_english if local_english else 1.0
+        ),
+    }
+
+
+async def main(sample_size: int, threshold: float, corpus: str | None = None) -> int:
+    # translation depends on this module
+    from yt_thumbsense.translation import (
+        close_libretranslate_client,
+        get_libretranslate_client,
+    )
+
+    try:
+        if corpus is not None:
+            with open(corpus, encoding="utf-8") as corpus_file:
+                texts = [line.strip() for line in corpus_file if line.strip()]
+        else:
+            db = await use_database()
+            texts = [
+                comment["text"]
+                async for comment in db["comments"].aggregate(
+                    [
+                        {"$sample": {"size": sample_size}},
+                        {"$project": {"_id": 0, "text": 1}},
+                    ]
+                )
+            ]
+
+        languages = await get_libretranslate_client().detect_many(texts)
+    finally:
+        await close_libretranslate_client()
+        await close_database()
+
+    remote_languages = [
+        None if isinstance(language, BaseException) else language
+        for language in languages
+    ]
+    report = confusion_report(texts, remote_languages, threshold)
+    for outcome, value in report.items():
+        if isinstance(value, float):
+            logger.info(f"{outcome}: {value:.2%}")
+        else:
+            logger.info(f"{outcome}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the local English detection with LibreTranslate"
+    )
+    parser.add_argument(
+        "--sample-size",
+        type=int,
+        default=1000,
+        help="Number of stored comments to sample",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=settings.local_language_detection_threshold,
+        help="Local confidence threshold",
+    )
+    parser.add_argument(
+        "--corpus",
+        help="File with one text per line to use instead of the stored comments",
+    )
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.sample_size, args.threshold, args.corpus)))
@@ -5,9 +5,12 @@ import uvicorn
 from fastapi import FastAPI
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import SlowAPIMiddleware
 
 from yt_thumbsense.config import get_settings
 from yt_thumbsense.core import limiter
+from yt_thumbsense.database import close_database, connect_database, use_database
+from yt_thumbsense.indexes import check_indexes, ensure_indexes
 from yt_thumbsense.routers import request, root, score, video
 from yt_thumbsense.scheduler import init_scheduler
 
@@ -20,9 +23,14 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(current_app: FastAPI):
+    await connect_database()
+    if get_settings().mongodb_ensure_indexes_on_startup:
+        db = await use_database()
+        await ensure_indexes(db)
+        await check_indexes(db)
     init_scheduler()
     yield
-    pass
+    await close_database()
 
 
 settings = get_settings()
@@ -55,6 +63,8 @@ app.include_router(score.router)
 # Limiter
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)  # type: ignore
+# Applies the default limits to every route not exempt or with its own limits
+app.add_middleware(SlowAPIMiddleware)
 
 if __name__ == "__main__":
     uvicorn.run(app)
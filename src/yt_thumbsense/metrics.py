@@ -0,0 +1,91 @@
+import time
+from datetime import datetime, timezone
+from typing import cast
+
+from loguru import logger
+from redis import RedisError
+from rq import Queue
+
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.worker import (
+    COMPLETIONS_BUCKET_SECONDS,
+    COMPLETIONS_KEY,
+    QUEUES,
+    redis_conn,
+)
+
+settings = get_settings()
+
+METRICS_KEY = f"{settings.app_name}:metrics"
+
+
+def increment(name: str, amount: int = 1):
+    """Add `amount` to the counter `name`, shared by every process through Redis.
+
+    Metrics are best effort, errors are logged and otherwise ignored.
+    """
+    if not amount:
+        return
+    try:
+        redis_conn.hincrby(METRICS_KEY, name, amount)
+    except RedisError as e:
+        logger.warning(f"Error incrementing metric {name}: {e}")
+
+
+def get_metrics() -> dict[str, int]:
+    try:
+        counters = cast(dict[bytes, bytes], redis_conn.hgetall(METRICS_KEY))
+    except RedisError as e:
+        logger.warning(f"Error reading metrics: {e}")
+        return {}
+    return {name.decode(): int(value) for name, value in counters.items()}
+
+
+def get_queue_wait_seconds(queue: Queue) -> float:
+    """Return how long the oldest job waiting on `queue` has been waiting, in
+    seconds, or 0 if the queue is empty."""
+    oldest_job_ids = queue.get_job_ids(0, 1)
+    if not oldest_job_ids:
+        return 0.0
+    oldest_job = queue.fetch_job(oldest_job_ids[0])
+    if oldest_job is None or oldest_job.enqueued_at is None:
+        return 0.0
+    # RQ stores the enqueue time in UTC
+    current_time = datetime.now(timezone.utc).replace(tzinfo=None)
+    wait_seconds = (
+        current_time - oldest_job.enqueued_at.replace(tzinfo=None)
+    ).total_seconds()
+    return max(wait_seconds, 0.0)
+
+
+def get_queue_gauges() -> dict[str, float]:
+    """Return the number of jobs waiting on each queue and how long the oldest of
+    them has been waiting, in seconds."""
+    gauges: dict[str, float] = {}
+    for queue in QUEUES:
+        try:
+            gauges[f"queue_depth:{queue.name}"] = queue.count
+            gauges[f"queue_wait_seconds:{queue.name}"] = get_queue_wait_seconds(queue)
+        except RedisError as e:
+            logger.warning(f"Error reading the depth of queue {queue.name}: {e}")
+    return gauges
+
+
+def get_throughput(window_seconds: int) -> float | None:
+    """Return the number of jobs finished per second by every worker over the last
+    `window_seconds`, or None if it can't be read."""
+    current_bucket = int(time.time()) // COMPLETIONS_BUCKET_SECONDS
+    buckets = max(window_seconds // COMPLETIONS_BUCKET_SECONDS, 1)
+    # The current bucket is still filling up, only complete buckets are counted
+    keys = [
+        f"{COMPLETIONS_KEY}:{bucket}"
+        for bucket in range(current_bucket - buckets, current_bucket)
+    ]
+    try:
+        completions = cast(list[bytes | None], redis_conn.mget(keys))
+    except RedisError as e:
+        logger.warning(f"Error reading the job throughput: {e}")
+        return None
+    return sum(int(count) for count in completions if count is not None) / (
+        buckets * COMPLETIONS_BUCKET_SECONDS
+    )
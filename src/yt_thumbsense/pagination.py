@@ -0,0 +1,118 @@
+import base64
+import binascii
+from typing import Any
+
+from bson import json_util
+from pymongo import ASCENDING, DESCENDING
+
+CURSOR_HEADER = "X-Next-Cursor"
+
+# Sort keys of the paginated endpoints, each one ends with `_id` so documents are
+# totally ordered and each page starts right after the last document of the previous
+VIDEO_SORTS: dict[str, list[tuple[str, int]]] = {
+    "oldest": [("_id", ASCENDING)],
+    "newest": [("_id", DESCENDING)],
+}
+COMMENT_SORTS: dict[str, list[tuple[str, int]]] = {
+    "oldest": [("_id", ASCENDING)],
+    "newest": [("_id", DESCENDING)],
+    "top": [("votes", DESCENDING), ("_id", DESCENDING)],
+}
+
+
+def encode_cursor(sort: str, document: dict, sort_key: list[tuple[str, int]]) -> str:
+    """Encode the position of `document` in the `sort` order as an opaque cursor."""
+    position = {"sort": sort, "after": [document[field] for field, _ in sort_key]}
+    return base64.urlsafe_b64encode(json_util.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: str, sort_key: list[tuple[str, int]]) -> list:
+    """Decode a cursor returned by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed or was returned for another sort order
+    """
+    try:
+        position = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor.") from e
+
+    if (
+        not isinstance(position, dict)
+        or position.get("sort") != sort
+        or not isinstance(position.get("after"), list)
+        or len(position["after"]) != len(sort_key)
+    ):
+        raise ValueError("Invalid cursor for this sort order.")
+    return position["after"]
+
+
+def after_filter(sort_key: list[tuple[str, int]], after: list) -> dict[str, Any]:
+    """Build the filter matching the documents that come after the `after` values in
+    the `sort_key` order.
+
+    For a `(votes, _id)` key this is `votes < v OR (votes == v AND _id < id)` when
+    descending, which MongoDB answers with a range scan on the matching index.
+    """
+    branches = []
+    for position, (field, direction) in enumerate(sort_key):
+        branch = {
+            previous_field: after[previous_position]
+            for previous_position, (previous_field, _) in enumerate(sort_key[:position])
+        }
+        operator = "$gt" if direction == ASCENDING else "$lt"
+        branch[field] = {operator: after[position]}
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+
+async def find_page(
+    collection,
+    query: dict,
+    sort: str,
+    sort_key: list[tuple[str, int]],
+    limit: int,
+    cursor: str | None = None,
+    skip: int = 0,
+    projection: dict[str, int] | None = None,
+) -> tuple[list[dict], str | None]:
+    """Return a page of the documents matching `query` in the `sort` order.
+
+    Args:
+        collection: Collection to read
+        query: Filter of the documents to paginate
+        sort: Name of the sort order, stored in the cursors
+        sort_key: Fields and directions of the sort order
+        limit: Maximum number of documents to return
+        cursor: Cursor returned with the previous page, if any
+        skip: Number of documents to skip, only used without a cursor
+        projection: Fields to read, they must include the sort key
+
+    Returns:
+        The documents and the cursor of the next page, or None on the last page.
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    if cursor is not None:
+        query = {
+            "$and": [
+                query,
+                after_filter(sort_key, decode_cursor(cursor, sort, sort_key)),
+            ]
+        }
+        skip = 0
+
+    # Read one more document than needed to know whether there is a next page
+    documents = (
+        await collection.find(query, projection)
+        .sort(sort_key)
+        .skip(skip)
+        .limit(limit + 1)
+        .to_list(length=None)
+    )
+    if len(documents) <= limit:
+        return documents, None
+
+    documents = documents[:limit]
+    return documents, encode_cursor(sort, documents[-1], sort_key)
@@ -0,0 +1,49 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+
+import dateparser
+from dateutil.relativedelta import relativedelta
+
+# Relative times shown by YouTube next to comments, e.g. "3 days ago"
+_RELATIVE_TIME_PATTERN = re.compile(
+    r"^(\d+)\s+(second|minute|hour|day|week|month|year)s?\s+ago$"
+)
+_EDITED_SUFFIX = "(edited)"
+_UNIT_DELTAS = {
+    "second": relativedelta(seconds=1),
+    "minute": relativedelta(minutes=1),
+    "hour": relativedelta(hours=1),
+    "day": relativedelta(days=1),
+    "week": relativedelta(weeks=1),
+    "month": relativedelta(months=1),
+    "year": relativedelta(years=1),
+}
+
+PARSE_CACHE_SIZE = 1024
+
+
+def parse_relative_time(text: str, now: datetime | None = None) -> datetime | None:
+    """Parse the relative time of a YouTube comment, e.g. "2 years ago (edited)".
+
+    The common forms are parsed with a regular expression, anything else goes
+    through dateparser. Results are memoized per text and minute, the number of
+    distinct texts on a video is tiny compared to its number of comments.
+
+    Returns:
+        The time the text refers to, to the minute, or None if it can't be parsed.
+    """
+    if now is None:
+        now = datetime.now()
+    return _parse_relative_time(text, now.replace(second=0, microsecond=0))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_relative_time(text: str, reference_time: datetime) -> datetime | None:
+    normalized_text = " ".join(text.replace(_EDITED_SUFFIX, "").lower().split())
+    match = _RELATIVE_TIME_PATTERN.match(normalized_text)
+    if match is not None:
+        amount, unit = match.groups()
+        return reference_time - _UNIT_DELTAS[unit] * int(amount)
+
+    return dateparser.parse(normalized_text, settings={"RELATIVE_BASE": reference_time})
@@ -0,0 +1,40 @@
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> list[str]:
+    """Parse a comma separated `fields` selector against the fields of `model`.
+
+    Returns:
+        The selected fields in the order of the model, or every field of the model if
+        `fields` is None.
+
+    Raises:
+        ValueError: If a selected field isn't a field of the model
+    """
+    if fields is None:
+        return list(model.model_fields)
+
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected - model.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}.")
+    if not selected:
+        raise ValueError("No field selected.")
+    return [field for field in model.model_fields if field in selected]
+
+
+def projection(fields: list[str], sort_key: list[tuple[str, int]]) -> dict[str, int]:
+    """Build the projection reading `fields` and the sort key needed by the cursors."""
+    return {field: 1 for field in fields} | {field: 1 for field, _ in sort_key}
+
+
+def compact_response(
+    documents: list[dict], fields: list[str], headers: dict[str, str] | None = None
+) -> ORJSONResponse:
+    """Serialize the `fields` of `documents` as they are stored, without validating
+    them through the response model."""
+    return ORJSONResponse(
+        [{field: document.get(field) for field in fields} for document in documents],
+        headers=headers,
+    )
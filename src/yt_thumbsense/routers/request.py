@@ -2,24 +2,57 @@ import logging
 from datetime import datetime, timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
+from yt_thumbsense.admission import admission_retry_after
 from yt_thumbsense.config import Settings, get_settings
+from yt_thumbsense.core import limiter
 from yt_thumbsense.database import use_database
+from yt_thumbsense.jobs import enqueue_unique, start_job_id
+from yt_thumbsense.metrics import increment
 from yt_thumbsense.models.request import ProcessingStatus
 from yt_thumbsense.models.video import DetailedVideoItem, VideoItem
 from yt_thumbsense.tasks import start_single_video
 from yt_thumbsense.utils import is_valid_youtube_video
-from yt_thumbsense.worker import main_queue
+from yt_thumbsense.worker import interactive_queue
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
 
+def check_admission(response: Response, settings: Settings) -> bool:
+    """Check the queue backlog before enqueueing a video.
+
+    Returns:
+        Whether the video should be enqueued now. When the workers are overloaded
+        the request is rejected, or the video is left pending for the scheduled
+        sweep to pick up if `admission_overload_action` is "defer".
+    """
+    retry_after = admission_retry_after()
+    if retry_after is None:
+        return True
+
+    if settings.admission_overload_action == "defer":
+        increment("requests_deferred")
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Retry-After"] = str(retry_after)
+        return False
+
+    increment("requests_rejected")
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many videos are being processed, retry later.",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
 @router.post("/request/", response_model=DetailedVideoItem, tags=["request"])
+@limiter.limit(";".join(get_settings().request_rate_limits))
 async def request_by_video_id(
+    request: Request,
     video_to_process: VideoItem,
+    response: Response,
     settings: Annotated[Settings, Depends(get_settings)],
     db=Depends(use_database),
 ):
@@ -28,11 +61,12 @@ async def request_by_video_id(
 
     current_time: datetime = datetime.now()
 
-    if not is_valid_youtube_video(video_to_process.video_id):
+    if not await is_valid_youtube_video(video_to_process.video_id, db):
         raise HTTPException(status_code=400, detail="Invalid YouTube video ID.")
 
     existing_video = await db.videos.find_one({"video_id": video_to_process.video_id})
     if not existing_video:
+        enqueue = check_admission(response, settings)
         new_video = {
             "video_id": video_to_process.video_id,
             "status": ProcessingStatus.pending,
@@ -40,7 +74,13 @@ async def request_by_video_id(
             "updated_at": current_time.isoformat(),
         }
         await db.videos.insert_one(new_video)
-        main_queue.enqueue(
+        if not enqueue:
+            logger.info(f"Deferred video {video_to_process.video_id}.")
+            return new_video
+
+        enqueue_unique(
+            interactive_queue,
+            start_job_id(video_to_process.video_id, 0),
             start_single_video,
             video_to_process.video_id,
         )
@@ -54,6 +94,7 @@ async def request_by_video_id(
         reprocess_after = timedelta(hours=settings.reprocess_after_hours)
 
         if current_time - datetime.fromisoformat(last_updated) > reprocess_after:
+            enqueue = check_admission(response, settings)
             # Reset to pending and update timestamp
             await db.videos.update_one(
                 {"video_id": video_to_process.video_id},
@@ -67,7 +108,15 @@ async def request_by_video_id(
             existing_video["status"] = ProcessingStatus.pending
             existing_video["updated_at"] = current_time
 
-            main_queue.enqueue(
+            if not enqueue:
+                logger.info(f"Deferred video {video_to_process.video_id}.")
+                return existing_video
+
+            enqueue_unique(
+                interactive_queue,
+                start_job_id(
+                    video_to_process.video_id, existing_video.get("generation", 0)
+                ),
                 start_single_video,
                 video_to_process.video_id,
             )
@@ -3,6 +3,7 @@ from starlette.requests import Request
 
 from yt_thumbsense.config import get_settings
 from yt_thumbsense.core import limiter
+from yt_thumbsense.metrics import get_metrics, get_queue_gauges
 
 router = APIRouter()
 
@@ -19,3 +20,10 @@ async def root_path():
 @limiter.exempt
 async def health_check(request: Request):
     return {"status": "ok"}
+
+
+@router.get("/metrics", tags=["root"])
+@limiter.exempt
+async def metrics(request: Request):
+    """Return the counters shared by the API and the workers and the queue gauges."""
+    return {**get_metrics(), **get_queue_gauges()}
@@ -1,12 +1,15 @@
-from typing import Any, Dict, List
-
-import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from yt_thumbsense.database import use_database
 from yt_thumbsense.models.request import ProcessingStatus
 from yt_thumbsense.models.score import SentimentScoreItem
+from yt_thumbsense.scores import (
+    aggregate_video_score,
+    get_video_score,
+    save_video_score,
+    score_statistics,
+)
 from yt_thumbsense.utils import is_valid_youtube_video
 
 router = APIRouter()
@@ -29,55 +32,26 @@ async def get_score(video_id: str, db: AsyncIOMotorDatabase = Depends(use_databa
     Raises:
         HTTPException: If video_id is invalid or comments are not found/processed
     """
-    if not is_valid_youtube_video(video_id):
+    if not await is_valid_youtube_video(video_id, db):
         raise HTTPException(status_code=400, detail="Invalid YouTube video ID")
 
-    cursor = db.comments.find(
-        {"video_id": video_id, "status": ProcessingStatus.processed}
+    video_score = await get_video_score(db, video_id)
+    if video_score is not None:
+        return SentimentScoreItem(video_id=video_id, **score_statistics(video_score))
+
+    # Videos scored before the aggregates existed, compute them from the comments
+    video_score = await aggregate_video_score(
+        db, {"video_id": video_id, "status": ProcessingStatus.processed}
     )
-    comments: List[Dict[str, Any]] = await cursor.to_list(length=None)
 
-    if not comments:
+    if not video_score:
         raise HTTPException(status_code=404, detail="Comments not found")
 
-    if any(comment.get("vader_sentiment") is None for comment in comments):
+    if video_score["count"] < video_score["comment_count"]:
         raise HTTPException(
             status_code=500, detail="Sentiment not calculated for all comments"
         )
 
-    try:
-        vader_sentiment_dataframe: pd.DataFrame = pd.DataFrame(
-            [
-                comment["vader_sentiment"]
-                for comment in comments
-                if comment.get("vader_sentiment")
-            ]
-        )
+    await save_video_score(db, video_id, video_score)
 
-        compound_sentiment_score: float = float(
-            vader_sentiment_dataframe["compound"].mean()
-        )
-        compound_sentiment_score_std: float = float(
-            vader_sentiment_dataframe["compound"].std()
-        )
-        compound_sentiment_score_min: float = float(
-            vader_sentiment_dataframe["compound"].min()
-        )
-        compound_sentiment_score_max: float = float(
-            vader_sentiment_dataframe["compound"].max()
-        )
-
-        comment_count: int = len(comments)
-
-        return SentimentScoreItem(
-            video_id=video_id,
-            comment_count=comment_count,
-            sentiment_score=compound_sentiment_score,
-            sentiment_score_std=compound_sentiment_score_std,
-            sentiment_score_min=compound_sentiment_score_min,
-            sentiment_score_max=compound_sentiment_score_max,
-        )
-    except (KeyError, ValueError) as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error processing sentiment data: {str(e)}"
-        )
+    return SentimentScoreItem(video_id=video_id, **score_statistics(video_score))
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from yt_thumbsense.database import use_database
 from yt_thumbsense.models.comment import CommentItem
 from yt_thumbsense.models.video import DetailedVideoItem
+from yt_thumbsense.pagination import (
+    COMMENT_SORTS,
+    CURSOR_HEADER,
+    VIDEO_SORTS,
+    find_page,
+)
+from yt_thumbsense.responses import compact_response, parse_fields, projection
+from yt_thumbsense.scores import delete_video_score
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 1000
+
 
 @router.get("/video/{video_id}", tags=["videos"], response_model=DetailedVideoItem)
 async def get_video(video_id: str, db=Depends(use_database)):
@@ -23,22 +35,56 @@ async def delete_video(video_id: str, db=Depends(use_database)):
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    # Delete comments as well if the video is deleted
+    # Delete comments and their aggregates as well if the video is deleted
     await db.comments.delete_many({"video_id": video_id})
+    await delete_video_score(db, video_id)
 
     return {"message": "Video deleted"}
 
 
 @router.get("/videos", tags=["videos"], response_model=list[DetailedVideoItem])
-async def list_videos(skip: int = 0, limit: int = 10, db=Depends(use_database)):
+async def list_videos(
+    response: Response,
+    cursor: str | None = None,
+    sort: Literal["oldest", "newest"] = "oldest",
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+    compact: bool = False,
+    db=Depends(use_database),
+):
     """Return a paginated list of videos from the database.
 
+    The cursor of the next page is returned in the `X-Next-Cursor` header. Selecting
+    `fields` or `compact` returns the videos as they are stored, without validation.
+
     Args:
-        skip: Number of videos to skip (offset)
+        cursor: Cursor of the page to return, from the previous page
+        sort: Order of the videos
+        skip: Number of videos to skip (offset), use `cursor` instead
         limit: Maximum number of videos to return
+        fields: Comma separated fields to return
+        compact: Whether to skip the validation of the videos
     """
-    cursor = db.videos.find({}).skip(skip).limit(limit)
-    videos = await cursor.to_list(length=None)
+    try:
+        selected_fields = parse_fields(fields, DetailedVideoItem)
+        videos, next_cursor = await find_page(
+            db.videos,
+            {},
+            sort,
+            VIDEO_SORTS[sort],
+            limit,
+            cursor=cursor,
+            skip=skip,
+            projection=projection(selected_fields, VIDEO_SORTS[sort]),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {CURSOR_HEADER: next_cursor} if next_cursor is not None else {}
+    if compact or fields is not None:
+        return compact_response(videos, selected_fields, headers)
+    response.headers.update(headers)
     return videos
 
 
@@ -46,15 +92,48 @@ async def list_videos(skip: int = 0, limit: int = 10, db=Depends(use_database)):
     "/video/{video_id}/comments", tags=["videos"], response_model=list[CommentItem]
 )
 async def get_video_comments(
-    video_id: str, skip: int = 0, limit: int = 10, db=Depends(use_database)
+    video_id: str,
+    response: Response,
+    cursor: str | None = None,
+    sort: Literal["oldest", "newest", "top"] = "oldest",
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+    compact: bool = False,
+    db=Depends(use_database),
 ):
     """Return a paginated list of comments for a video.
 
+    The cursor of the next page is returned in the `X-Next-Cursor` header. Selecting
+    `fields` or `compact` returns the comments as they are stored, without
+    validation.
+
     Args:
         video_id: ID of the video to get comments for
-        skip: Number of comments to skip (offset)
+        cursor: Cursor of the page to return, from the previous page
+        sort: Order of the comments, "top" sorts them by votes
+        skip: Number of comments to skip (offset), use `cursor` instead
         limit: Maximum number of comments to return
+        fields: Comma separated fields to return, e.g. "comment_id,vader_sentiment"
+        compact: Whether to skip the validation of the comments
     """
-    cursor = db.comments.find({"video_id": video_id}).skip(skip).limit(limit)
-    comments = await cursor.to_list(length=None)
+    try:
+        selected_fields = parse_fields(fields, CommentItem)
+        comments, next_cursor = await find_page(
+            db.comments,
+            {"video_id": video_id},
+            sort,
+            COMMENT_SORTS[sort],
+            limit,
+            cursor=cursor,
+            skip=skip,
+            projection=projection(selected_fields, COMMENT_SORTS[sort]),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {CURSOR_HEADER: next_cursor} if next_cursor is not None else {}
+    if compact or fields is not None:
+        return compact_response(comments, selected_fields, headers)
+    response.headers.update(headers)
     return comments
@@ -1,5 +1,5 @@
 from yt_thumbsense.main import get_settings
-from yt_thumbsense.tasks import start_pending_videos
+from yt_thumbsense.tasks import reap_expired_leases, start_pending_videos
 from yt_thumbsense.worker import scheduler
 
 
@@ -10,3 +10,7 @@ def init_scheduler():
         cron_string=f"*/{settings.process_pending_videos_interval_minutes} * * * *",
         func=start_pending_videos,
     )
+    scheduler.cron(
+        cron_string=f"*/{settings.reap_expired_leases_interval_minutes} * * * *",
+        func=reap_expired_leases,
+    )
@@ -0,0 +1,209 @@
+import math
+from datetime import datetime
+
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+VIDEO_SCORES_COLLECTION = "video_scores"
+
+# Rebuilds of the aggregates of a video racing with concurrent updates
+RECOMPUTE_MAX_ATTEMPTS = 3
+
+
+def score_statistics(video_score: dict) -> dict:
+    """Derive the mean, sample standard deviation, min and max of the compound
+    sentiment from the running aggregates of a video."""
+    count: int = video_score["count"]
+    mean: float = video_score["sum"] / count
+    variance: float = 0.0
+    if count > 1:
+        variance = max(
+            (video_score["sum_squares"] - video_score["sum"] ** 2 / count)
+            / (count - 1),
+            0.0,
+        )
+
+    return {
+        "comment_count": count,
+        "sentiment_score": mean,
+        "sentiment_score_std": math.sqrt(variance),
+        "sentiment_score_min": video_score["min"],
+        "sentiment_score_max": video_score["max"],
+    }
+
+
+async def get_video_score(db: AsyncIOMotorDatabase, video_id: str) -> dict | None:
+    video_score = await db[VIDEO_SCORES_COLLECTION].find_one({"video_id": video_id})
+    if not video_score or not video_score.get("count"):
+        return None
+    return video_score
+
+
+def _video_score_pipeline(match: dict) -> list[dict]:
+    compound = "$vader_sentiment.compound"
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": None,
+                "comment_count": {"$sum": 1},
+                "count": {"$sum": {"$cond": [{"$isNumber": compound}, 1, 0]}},
+                "sum": {"$sum": compound},
+                "sum_squares": {"$sum": {"$multiply": [compound, compound]}},
+                "min": {"$min": compound},
+                "max": {"$max": compound},
+            }
+        },
+        {"$project": {"_id": 0}},
+    ]
+
+
+async def aggregate_video_score(db: AsyncIOMotorDatabase, match: dict) -> dict | None:
+    """Compute the aggregates of the compound sentiment of the comments matching
+    `match` on the database, without loading the comments.
+
+    Returns:
+        The aggregates, with `comment_count` being the number of matching comments
+        and `count` the number of them with a compound sentiment, or None if no
+        comment matches.
+    """
+    async for video_score in db["comments"].aggregate(_video_score_pipeline(match)):
+        if video_score["comment_count"]:
+            return video_score
+    return None
+
+
+async def save_video_score(
+    db: AsyncIOMotorDatabase,
+    video_id: str,
+    aggregates: dict,
+    current: dict | None = None,
+) -> bool:
+    """Replace the running aggregates of a video, unless they changed since they
+    were read, e.g. by a concurrent `update_video_score`.
+
+    Args:
+        db: Database connection
+        video_id: YouTube video ID
+        aggregates: New aggregates, the stored ones are deleted if they count nothing
+        current: Stored aggregates read before computing `aggregates`, None if the
+            video had none
+
+    Returns:
+        Whether the aggregates were replaced.
+    """
+    if current is None:
+        if not aggregates.get("count"):
+            return True
+        current_filter: dict = {"video_id": video_id}
+        version = 1
+    else:
+        current_filter = {"video_id": video_id, "version": current.get("version")}
+        version = current.get("version", 0) + 1
+        if not aggregates.get("count"):
+            deleted = await db[VIDEO_SCORES_COLLECTION].delete_one(current_filter)
+            return deleted.deleted_count == 1
+
+    video_score = {
+        "video_id": video_id,
+        "count": aggregates["count"],
+        "sum": aggregates["sum"],
+        "sum_squares": aggregates["sum_squares"],
+        "min": aggregates["min"],
+        "max": aggregates["max"],
+        "version": version,
+        "updated_at": datetime.now().isoformat(),
+    }
+    if current is None:
+        try:
+            await db[VIDEO_SCORES_COLLECTION].insert_one(video_score)
+        except DuplicateKeyError:
+            return False
+        return True
+    replaced = await db[VIDEO_SCORES_COLLECTION].replace_one(
+        current_filter, video_score
+    )
+    return replaced.matched_count == 1
+
+
+async def recompute_video_score(db: AsyncIOMotorDatabase, video_id: str) -> dict | None:
+    """Rebuild the running aggregates of a video from its scored comments, again if
+    they were updated concurrently, up to `RECOMPUTE_MAX_ATTEMPTS` times.
+
+    Returns:
+        The rebuilt aggregates, or None if no comment is scored or they kept
+        changing.
+    """
+    for _ in range(RECOMPUTE_MAX_ATTEMPTS):
+        # Read before aggregating, updates of comments written since then change it
+        current = await db[VIDEO_SCORES_COLLECTION].find_one(
+            {"video_id": video_id}, {"_id": 0, "version": 1}
+        )
+        aggregates = await aggregate_video_score(
+            db,
+            {"video_id": video_id, "vader_sentiment.compound": {"$type": "number"}},
+        )
+        if await save_video_score(db, video_id, aggregates or {}, current):
+            return await get_video_score(db, video_id)
+
+    logger.warning(f"Sentiment aggregates of video {video_id} kept changing")
+    return None
+
+
+async def update_video_score(
+    db: AsyncIOMotorDatabase,
+    video_id: str,
+    changes: list[tuple[float | None, float]],
+):
+    """Atomically fold newly calculated compound scores into the aggregates of a
+    video, or build them from its scored comments if it has none yet, e.g. it was
+    scored before the aggregates existed.
+
+    Args:
+        db: Database connection
+        video_id: YouTube video ID
+        changes: Pairs of (previous compound of the comment, or None if the comment
+            was never scored, new compound)
+    """
+    if not changes:
+        return
+
+    new_compounds = [new for _, new in changes]
+    video_score = await db[VIDEO_SCORES_COLLECTION].find_one_and_update(
+        {"video_id": video_id},
+        {
+            "$inc": {
+                "count": sum(1 for previous, _ in changes if previous is None),
+                "sum": sum(new - (previous or 0.0) for previous, new in changes),
+                "sum_squares": sum(
+                    new**2 - (previous or 0.0) ** 2 for previous, new in changes
+                ),
+                "version": 1,
+            },
+            "$min": {"min": min(new_compounds)},
+            "$max": {"max": max(new_compounds)},
+            "$set": {"updated_at": datetime.now().isoformat()},
+        },
+        return_document=ReturnDocument.AFTER,
+    )
+    if video_score is None:
+        # The comments are scored before the aggregates are updated
+        logger.debug(f"Building sentiment aggregates for video {video_id}")
+        await recompute_video_score(db, video_id)
+        return
+
+    # Min and max can't be decremented, rebuild them if a replaced score was one
+    replaced = {
+        previous
+        for previous, new in changes
+        if previous is not None and previous != new
+    }
+    if video_score["min"] in replaced or video_score["max"] in replaced:
+        logger.debug(f"Recomputing sentiment aggregates for video {video_id}")
+        await recompute_video_score(db, video_id)
+
+
+async def delete_video_score(db: AsyncIOMotorDatabase, video_id: str):
+    await db[VIDEO_SCORES_COLLECTION].delete_one({"video_id": video_id})
@@ -0,0 +1,53 @@
+import hashlib
+import threading
+from importlib.metadata import version
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from yt_thumbsense.translation import normalize_text
+
+# Part of the content hashes, so comments are scored again when the scoring changes
+SCORING_VERSION = f"vader-{version('vaderSentiment')}"
+
+_analyzer: SentimentIntensityAnalyzer | None = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer() -> SentimentIntensityAnalyzer:
+    """Return the VADER analyzer of the process, loading its lexicons on first use."""
+    global _analyzer
+
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def score(text: str) -> dict[str, float]:
+    return get_analyzer().polarity_scores(normalize_text(text))
+
+
+def score_batch(texts: list[str]) -> list[dict[str, float]]:
+    """Score the VADER sentiment of `texts`, scoring repeated texts only once.
+
+    Texts are compared after normalization, so texts that only differ in
+    whitespace share a score.
+    """
+    analyzer = get_analyzer()
+    scores: dict[str, dict[str, float]] = {}
+    results: list[dict[str, float]] = []
+    for text in texts:
+        normalized_text = normalize_text(text)
+        if normalized_text not in scores:
+            scores[normalized_text] = analyzer.polarity_scores(normalized_text)
+        results.append(dict(scores[normalized_text]))
+    return results
+
+
+def content_hash(text: str) -> str:
+    """Hash the normalized `text` of a comment along with the scoring version, a
+    comment with the same hash doesn't need to be scored again."""
+    return hashlib.sha256(
+        f"{SCORING_VERSION}\n{normalize_text(text)}".encode("utf-8")
+    ).hexdigest()
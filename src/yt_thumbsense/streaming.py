@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from typing import AsyncGenerator, Iterable, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _ProducerError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def stream_in_thread(
+    iterable: Iterable[T], maxsize: int
+) -> AsyncGenerator[T, None]:
+    """Iterate a blocking iterable from a producer thread without blocking the event
+    loop.
+
+    The producer reads ahead while the consumer processes the items, up to `maxsize`
+    items, and waits for the consumer once the buffer is full. Errors raised by the
+    iterable are raised to the consumer. Use it with `contextlib.aclosing` so the
+    producer stops when the consumer stops early.
+    """
+    loop = asyncio.get_running_loop()
+    buffer: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item):
+        asyncio.run_coroutine_threadsafe(buffer.put(item), loop).result()
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if stopped.is_set():
+                    return
+                put(item)
+            if not stopped.is_set():
+                put(_DONE)
+        except BaseException as e:
+            if not stopped.is_set():
+                put(_ProducerError(e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="stream-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = await buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        # Unblock a producer waiting for room in the buffer, it checks `stopped`
+        # before putting anything else
+        while not buffer.empty():
+            buffer.get_nowait()
@@ -1,184 +1,646 @@
-from datetime import datetime
+from contextlib import aclosing
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import uuid4
 
-import dateparser
-from libretranslatepy import LibreTranslateAPI
 from loguru import logger
-from motor.motor_asyncio import AsyncIOMotorClient
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from youtube_comment_downloader import SORT_BY_POPULAR, YoutubeCommentDownloader
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from rq import Queue
+from youtube_comment_downloader import SORT_BY_POPULAR, SORT_BY_RECENT
 
 from yt_thumbsense.config import get_settings
 from yt_thumbsense.database import use_database
+from yt_thumbsense.jobs import (
+    enqueue_unique,
+    is_job_pending,
+    pull_job_id,
+    sentiment_job_id,
+)
+from yt_thumbsense.metrics import increment
 from yt_thumbsense.models.request import ProcessingStatus
-from yt_thumbsense.worker import main_queue
+from yt_thumbsense.relative_time import parse_relative_time
+from yt_thumbsense.scores import update_video_score
+from yt_thumbsense.sentiment import content_hash, get_analyzer, score, score_batch
+from yt_thumbsense.streaming import stream_in_thread
+from yt_thumbsense.translation import get_libretranslate_client, translate_to_english
+from yt_thumbsense.worker import background_queue, ingestion_queue, sentiment_queue
+from yt_thumbsense.youtube import CHECKPOINT_KEY, ResumableCommentDownloader
+
+
+class VideoClaimLost(Exception):
+    """The video was claimed again since the ingestion job was enqueued."""
+
+
+def _lease_expiry(current_time: datetime, lease_seconds: int) -> str:
+    return (current_time + timedelta(seconds=lease_seconds)).isoformat()
+
+
+def _claim_update(claim_token: str, current_time: datetime) -> dict:
+    settings = get_settings()
+    return {
+        "$set": {
+            "status": ProcessingStatus.processing,
+            "updated_at": current_time.isoformat(),
+            "claim_token": claim_token,
+            "lease_expires_at": _lease_expiry(
+                current_time, settings.video_lease_seconds
+            ),
+        },
+        # Every claim starts a new generation of the processing of the video
+        "$inc": {"generation": 1},
+    }
+
+
+def _video_claim_filter(video_id: str, generation: int | None) -> dict:
+    """Match a video as long as it's still claimed for the ingestion of `generation`,
+    or in any state for jobs enqueued without a generation."""
+    if generation is None:
+        return {"video_id": video_id}
+    return {
+        "video_id": video_id,
+        "status": ProcessingStatus.processing,
+        "generation": generation,
+    }
+
+
+async def _renew_video_lease(
+    db: AsyncIOMotorClient,
+    video_id: str,
+    checkpoint: dict | None = None,
+    generation: int | None = None,
+):
+    """Record a heartbeat of the ingestion of a video and push its lease forward,
+    along with the ingestion `checkpoint` to resume from if given.
+
+    Raises:
+        VideoClaimLost: If the video isn't claimed for `generation` anymore
+    """
+    settings = get_settings()
+    current_time = datetime.now()
+    update: dict[str, Any] = {
+        "heartbeat_at": current_time.isoformat(),
+        "lease_expires_at": _lease_expiry(current_time, settings.video_lease_seconds),
+    }
+    if checkpoint is not None:
+        update["ingestion_checkpoint"] = {
+            **checkpoint,
+            "updated_at": current_time.isoformat(),
+        }
+    result = await db["videos"].update_one(
+        {
+            **_video_claim_filter(video_id, generation),
+            "status": ProcessingStatus.processing,
+        },
+        {"$set": update},
+    )
+    if generation is not None and result.matched_count == 0:
+        raise VideoClaimLost(f"Video {video_id} was claimed again")
+
+
+def _resumable_checkpoint(video: dict, current_time: datetime) -> dict | None:
+    """Return the checkpoint left by an interrupted ingestion of `video`, unless it is
+    too old for its continuation tokens to still be valid."""
+    settings = get_settings()
+    checkpoint = video.get("ingestion_checkpoint")
+    if checkpoint is None:
+        return None
+    max_age = timedelta(seconds=settings.ingestion_checkpoint_max_age_seconds)
+    if checkpoint["updated_at"] < (current_time - max_age).isoformat():
+        return None
+    return checkpoint
 
 
 async def start_single_video(video_id: str):
     db: AsyncIOMotorClient = await use_database()
 
-    video = await db["videos"].find_one({"video_id": video_id})
+    # Claim the video atomically so it's only enqueued once
+    video = await db["videos"].find_one_and_update(
+        {"video_id": video_id, "status": ProcessingStatus.pending},
+        _claim_update(uuid4().hex, datetime.now()),
+        projection={"video_id": 1, "generation": 1},
+        return_document=ReturnDocument.AFTER,
+    )
 
-    if not video:
-        logger.error(f"Video {video_id} not found on database.")
+    if video:
+        enqueue_unique(
+            ingestion_queue,
+            pull_job_id(video_id, video["generation"]),
+            pull_video_comments_from_youtube,
+            video_id,
+            video["generation"],
+        )
         return
 
-    if video["status"] == ProcessingStatus.pending:
-        await db["videos"].update_one(
-            {"video_id": video_id},
-            {
-                "$set": {
-                    "status": ProcessingStatus.processing,
-                    "updated_at": datetime.now().isoformat(),
-                }
-            },
-        )
-        main_queue.enqueue(pull_video_comments_from_youtube, video_id)
+    video = await db["videos"].find_one({"video_id": video_id}, {"status": 1})
+    if not video:
+        logger.error(f"Video {video_id} not found on database.")
     else:
         logger.info(
             f"Video {video_id} is not able to be processed. Status is {video['status']}."
         )
 
 
+async def claim_pending_videos(
+    db: AsyncIOMotorClient, claim_token: str, limit: int
+) -> list[dict]:
+    """Atomically move up to `limit` of the oldest pending videos to processing,
+    tagging them with `claim_token` and a lease expiry.
+
+    Videos claimed concurrently by someone else are left out.
+
+    Returns:
+        The `video_id` and `generation` of the claimed videos.
+    """
+    candidates = [
+        video["video_id"]
+        async for video in db["videos"]
+        .find({"status": ProcessingStatus.pending}, {"video_id": 1})
+        .sort("updated_at", ASCENDING)
+        .limit(limit)
+    ]
+    if not candidates:
+        return []
+
+    await db["videos"].update_many(
+        {"video_id": {"$in": candidates}, "status": ProcessingStatus.pending},
+        _claim_update(claim_token, datetime.now()),
+    )
+    return await (
+        db["videos"]
+        .find(
+            {"video_id": {"$in": candidates}, "claim_token": claim_token},
+            {"_id": 0, "video_id": 1, "generation": 1},
+        )
+        .to_list(None)
+    )
+
+
 async def start_pending_videos():
     logger.info("Started looking for pending videos")
+    settings = get_settings()
     db: AsyncIOMotorClient = await use_database()
-    pending_videos = (
-        await db["videos"].find({"status": ProcessingStatus.pending}).to_list(None)
-    )
 
-    if not pending_videos:
+    claim_token = uuid4().hex
+    claimed: int = 0
+    while claimed < settings.pending_videos_max_claims_per_run:
+        videos = await claim_pending_videos(
+            db,
+            claim_token,
+            min(
+                settings.pending_videos_claim_batch_size,
+                settings.pending_videos_max_claims_per_run - claimed,
+            ),
+        )
+        if not videos:
+            break
+
+        for video in videos:
+            logger.info(f"Processing video {video['video_id']}")
+            enqueue_unique(
+                background_queue,
+                pull_job_id(video["video_id"], video["generation"]),
+                pull_video_comments_from_youtube,
+                video["video_id"],
+                video["generation"],
+                background=True,
+            )
+        claimed += len(videos)
+
+    if not claimed:
         logger.info("No pending videos found")
         return
 
-    logger.info(f"{len(pending_videos)} pending video(s) found")
-
-    for pending_video in pending_videos:
-        logger.info(f"Processing video {pending_video['video_id']}")
-        await db["videos"].update_one(
-            {"video_id": pending_video["video_id"]},
-            {
-                "$set": {
-                    "status": ProcessingStatus.processing,
-                    "updated_at": datetime.now().isoformat(),
-                }
-            },
-        )
-        main_queue.enqueue(pull_video_comments_from_youtube, pending_video["video_id"])
+    logger.info(f"Claimed {claimed} pending video(s)")
 
 
-async def pull_video_comments_from_youtube(video_id: str):
-    logger.info(f"Processing video {video_id}")
-    settings = get_settings()
-    current_time = datetime.now()
+def _parse_youtube_comment(comment: dict) -> dict:
+    """Convert a comment returned by the YouTube downloader to the fields stored."""
+    comment_parent_id = None
+    if comment.get("reply", False):
+        comment_parent_id, comment_id = comment.get("cid", "").split(".", 1)
+    else:
+        comment_id = comment.get("cid", "")
 
-    db: AsyncIOMotorClient = await use_database()
+    try:
+        time_posted = parse_relative_time(comment.get("time", "")).isoformat()  # type: ignore
+    except Exception as e:
+        logger.error(
+            f"Error parsing date `{comment.get('time','')}` from comment {comment_id}. Error: {e}"
+        )
+        time_posted = None
 
-    existing_video = await db["videos"].find_one({"video_id": video_id})
-    if existing_video is None:
-        logger.error(f"Video {video_id} not found on database.")
-        return
+    try:
+        votes = int(comment.get("votes", 0))
+    except Exception:
+        votes = 0
 
     try:
-        youtube_downloader = YoutubeCommentDownloader()
-        comments = youtube_downloader.get_comments(video_id, sort_by=SORT_BY_POPULAR)
-        amount_loaded: int = 0
-        for comment in comments:
+        replies = int(comment.get("replies", 0))
+    except Exception:
+        replies = 0
+
+    return {
+        "comment_id": comment_id,
+        "comment_parent_id": comment_parent_id,
+        "text": comment.get("text", ""),
+        "votes": votes,
+        "replies": replies,
+        "time_posted_raw": comment.get("time", ""),
+        "time_posted": time_posted,
+    }
+
+
+async def _pull_all_video_comments(
+    db: AsyncIOMotorClient,
+    video_id: str,
+    checkpoint: dict | None,
+    current_time: datetime,
+    queue: Queue,
+    generation: int | None = None,
+):
+    """Pull the most popular comments of a video, from its first page or from
+    `checkpoint`, checkpointing the position of the download along the way, and
+    enqueue their sentiment calculation on `queue`."""
+    settings = get_settings()
+    youtube_downloader = ResumableCommentDownloader()
+    amount_loaded: int = 0
+    if checkpoint is not None:
+        logger.info(
+            f"Resuming video {video_id} after {checkpoint['amount_loaded']} "
+            "comment(s)"
+        )
+        increment("ingestion_resumed")
+        amount_loaded = checkpoint["amount_loaded"]
+    unchanged: int = 0
+    batch: dict[str, dict] = {}
+    # Position after the last page whose comments are all in `batch` or written
+    page_checkpoint: dict | None = None
+    # The next pages download in a thread while the batches are written
+    async with aclosing(
+        stream_in_thread(
+            youtube_downloader.get_comments(
+                video_id,
+                sort_by=SORT_BY_POPULAR,
+                checkpoint=None if checkpoint is None else checkpoint["state"],
+            ),
+            maxsize=settings.comments_stream_buffer_size,
+        )
+    ) as comments:
+        async for comment in comments:
             if amount_loaded >= settings.max_comments_per_video:
                 logger.debug(
                     f"Reached max comments per video {settings.max_comments_per_video}"
                 )
                 break
 
-            comment_parent_id = None
-            if comment.get("reply", False):
-                comment_parent_id, comment_id = comment.get("cid", "").split(".", 1)
-            else:
-                comment_id = comment.get("cid", "")
-
-            try:
-                if "edited" in comment.get("time", ""):
-                    time_posted = dateparser.parse(
-                        comment.get("time", "").replace("(edited)", "")
-                    ).isoformat()  # type: ignore
-                else:
-                    time_posted = dateparser.parse(comment.get("time", "")).isoformat()  # type: ignore
-            except Exception as e:
-                logger.error(
-                    f"Error parsing date `{comment.get('time','')}` from comment {comment_id}. Error: {e}"
+            parsed_comment = _parse_youtube_comment(comment)
+            if parsed_comment["comment_id"] not in batch:
+                amount_loaded += 1
+            batch[parsed_comment["comment_id"]] = parsed_comment
+
+            state = comment.get(CHECKPOINT_KEY)
+            if state is not None:
+                page_checkpoint = {"state": state, "amount_loaded": amount_loaded}
+
+            if len(batch) >= settings.comments_bulk_write_batch_size:
+                _, _, batch_unchanged = await _write_comments_batch(
+                    db, video_id, batch, current_time, queue
                 )
-                time_posted = None
+                unchanged += batch_unchanged
+                await _renew_video_lease(db, video_id, page_checkpoint, generation)
+                batch = {}
 
-            try:
-                votes = int(comment.get("votes", 0))
-            except Exception:
-                votes = 0
+    if batch:
+        _, _, batch_unchanged = await _write_comments_batch(
+            db, video_id, batch, current_time, queue
+        )
+        unchanged += batch_unchanged
 
-            try:
-                replies = int(comment.get("replies", 0))
-            except Exception:
-                replies = 0
+    logger.info(
+        f"Pulled {amount_loaded} comment(s) for video {video_id}, skipped scoring "
+        f"{unchanged} unchanged comment(s)"
+    )
 
-            existing_comment = await db["comments"].find_one(
-                {"video_id": video_id, "comment_id": comment_id}
-            )
-            if existing_comment is not None:
-                logger.debug(f"Updating comment {comment_id} for video {video_id}")
-                await db["comments"].update_one(
-                    {"video_id": video_id, "comment_id": comment_id},
-                    {
-                        "$set": {
-                            "text": comment.get("text", ""),
-                            "votes": votes,
-                            "replies": replies,
-                            "time_posted_raw": comment.get("time", ""),
-                            "time_posted": time_posted,
-                            "status": ProcessingStatus.pending,
-                            "updated_at": current_time.isoformat(),
-                        }
-                    },
-                )
+
+async def _refresh_video_comments(
+    db: AsyncIOMotorClient,
+    video_id: str,
+    current_time: datetime,
+    queue: Queue,
+    generation: int | None = None,
+):
+    """Pull the comments posted since the last pull of a video and refresh the votes
+    of its most popular comments, leaving the other known comments untouched. The
+    sentiment calculation of the new comments is enqueued on `queue`.
+
+    The newest comments are pulled until `incremental_refresh_known_streak` known
+    comments follow each other, a few known comments can be interleaved with new
+    ones, e.g. a pinned comment.
+    """
+    settings = get_settings()
+    known_comment_ids = {
+        comment["comment_id"]
+        async for comment in db["comments"].find(
+            {"video_id": video_id}, {"_id": 0, "comment_id": 1}
+        )
+    }
+    youtube_downloader = ResumableCommentDownloader()
+
+    new_comments: int = 0
+    known_streak: int = 0
+    batch: dict[str, dict] = {}
+    async with aclosing(
+        stream_in_thread(
+            youtube_downloader.get_comments(video_id, sort_by=SORT_BY_RECENT),
+            maxsize=settings.comments_stream_buffer_size,
+        )
+    ) as comments:
+        async for comment in comments:
+            parsed_comment = _parse_youtube_comment(comment)
+            comment_id = parsed_comment["comment_id"]
+            if comment_id in known_comment_ids:
+                # Replies are listed under their parent, whatever their age
+                if parsed_comment["comment_parent_id"] is None:
+                    known_streak += 1
+                    if known_streak >= settings.incremental_refresh_known_streak:
+                        break
                 continue
-            else:
-                logger.debug(f"Inserting comment {comment_id} for video {video_id}")
-                await db["comments"].insert_one(
-                    {
-                        "video_id": video_id,
-                        "comment_id": comment_id,
-                        "comment_parent_id": comment_parent_id,
-                        "text": comment.get("text", ""),
-                        "votes": votes,
-                        "replies": replies,
-                        "time_posted_raw": comment.get("time", ""),
-                        "time_posted": time_posted,
-                        "status": ProcessingStatus.pending,
-                        "created_at": current_time.isoformat(),
-                        "updated_at": current_time.isoformat(),
-                    }
+
+            if parsed_comment["comment_parent_id"] is None:
+                known_streak = 0
+            if new_comments >= settings.max_comments_per_video:
+                break
+            if comment_id not in batch:
+                new_comments += 1
+            batch[comment_id] = parsed_comment
+
+            if len(batch) >= settings.comments_bulk_write_batch_size:
+                await _write_comments_batch(db, video_id, batch, current_time, queue)
+                await _renew_video_lease(db, video_id, generation=generation)
+                known_comment_ids.update(batch)
+                batch = {}
+
+    if batch:
+        await _write_comments_batch(db, video_id, batch, current_time, queue)
+        known_comment_ids.update(batch)
+        batch = {}
+
+    # Votes mostly change on the popular comments, only those are refreshed
+    vote_updates: list[UpdateOne] = []
+    async with aclosing(
+        stream_in_thread(
+            youtube_downloader.get_comments(video_id, sort_by=SORT_BY_POPULAR),
+            maxsize=settings.comments_stream_buffer_size,
+        )
+    ) as comments:
+        async for comment in comments:
+            if (
+                len(vote_updates) + len(batch)
+                >= settings.incremental_refresh_top_comments
+            ):
+                break
+            parsed_comment = _parse_youtube_comment(comment)
+            if parsed_comment["comment_id"] in known_comment_ids:
+                vote_updates.append(
+                    UpdateOne(
+                        {
+                            "video_id": video_id,
+                            "comment_id": parsed_comment["comment_id"],
+                        },
+                        {
+                            "$set": {
+                                "votes": parsed_comment["votes"],
+                                "replies": parsed_comment["replies"],
+                            }
+                        },
+                    )
                 )
+            else:
+                # Not reached by the pull of the newest comments
+                batch[parsed_comment["comment_id"]] = parsed_comment
+
+    if batch:
+        await _write_comments_batch(db, video_id, batch, current_time, queue)
+        new_comments += len(batch)
+    if vote_updates:
+        await db["comments"].bulk_write(vote_updates, ordered=False)
+
+    logger.info(
+        f"Refreshed video {video_id}: {new_comments} new comment(s), "
+        f"{len(vote_updates)} vote count(s) refreshed"
+    )
+    increment("refresh_new_comments", new_comments)
+    increment("refresh_votes_updated", len(vote_updates))
+
+
+async def pull_video_comments_from_youtube(
+    video_id: str, generation: int | None = None, background: bool = False
+):
+    """Pull the comments of a video claimed for processing.
+
+    Args:
+        video_id: YouTube video ID
+        generation: Generation of the claim the job was enqueued for, the job gives up
+            as soon as the video is claimed again, e.g. after its lease expired
+        background: Whether the video was claimed by a background sweep, its
+            comments are then scored on the background queue so they don't hold up
+            the requested videos
+    """
+    logger.info(f"Processing video {video_id}")
+    settings = get_settings()
+    current_time = datetime.now()
 
-            amount_loaded += 1
+    db: AsyncIOMotorClient = await use_database()
 
-            main_queue.enqueue(
-                calculate_single_video_comment_sentiment, video_id, comment_id
+    existing_video = await db["videos"].find_one({"video_id": video_id})
+    if existing_video is None:
+        logger.error(f"Video {video_id} not found on database.")
+        return
+
+    queue = background_queue if background else sentiment_queue
+    claim_filter = _video_claim_filter(video_id, generation)
+    checkpoint = _resumable_checkpoint(existing_video, current_time)
+    try:
+        await _renew_video_lease(db, video_id, generation=generation)
+        if (
+            settings.incremental_refresh
+            and checkpoint is None
+            and "pulled_at" in existing_video
+        ):
+            await _refresh_video_comments(db, video_id, current_time, queue, generation)
+        else:
+            await _pull_all_video_comments(
+                db, video_id, checkpoint, current_time, queue, generation
             )
 
         await db["videos"].update_one(
-            {"video_id": video_id},
-            {"$set": {"status": ProcessingStatus.processed}},
+            claim_filter,
+            {
+                "$set": {
+                    "status": ProcessingStatus.processed,
+                    "lease_retries": 0,
+                    "pulled_at": current_time.isoformat(),
+                },
+                "$unset": {
+                    "claim_token": "",
+                    "lease_expires_at": "",
+                    "ingestion_checkpoint": "",
+                },
+            },
         )
         logger.info(f"Finished pulling comments for video {video_id}")
+    except VideoClaimLost:
+        logger.warning(
+            f"Video {video_id} was claimed again since generation {generation}, "
+            "leaving it to the new claim"
+        )
     except Exception as e:
         logger.error(f"Error pulling comments for video {video_id}: {e}")
+        video = await db["videos"].find_one(
+            {"video_id": video_id}, {"ingestion_checkpoint": 1, "lease_retries": 1}
+        )
+        if (
+            video is not None
+            and "ingestion_checkpoint" in video
+            and video.get("lease_retries", 0) < settings.lease_max_retries
+        ):
+            # Let the scheduled sweep resume it from the checkpoint
+            logger.info(f"Video {video_id} will resume from its checkpoint")
+            await db["videos"].update_one(
+                claim_filter,
+                {
+                    "$set": {
+                        "status": ProcessingStatus.pending,
+                        "updated_at": datetime.now().isoformat(),
+                    },
+                    "$inc": {"lease_retries": 1},
+                    "$unset": {"claim_token": "", "lease_expires_at": ""},
+                },
+            )
+            return
+
         await db["videos"].update_one(
-            {"video_id": video_id},
-            {"$set": {"status": ProcessingStatus.failed}},
+            claim_filter,
+            {
+                "$set": {"status": ProcessingStatus.failed},
+                "$unset": {"claim_token": "", "lease_expires_at": ""},
+            },
+        )
+
+
+async def _write_comments_batch(
+    db: AsyncIOMotorClient,
+    video_id: str,
+    batch: dict[str, dict],
+    current_time: datetime,
+    queue: Queue,
+) -> tuple[int, int, int]:
+    """Upsert a batch of comments with a single unordered bulk write and enqueue
+    the sentiment calculation of the new and changed ones on `queue`.
+
+    Processed comments whose content hash didn't change only get their votes,
+    replies and times updated, they keep their sentiment.
+
+    Returns:
+        The number of inserted, updated and unchanged comments.
+    """
+    settings = get_settings()
+    lease_expires_at = _lease_expiry(current_time, settings.comment_lease_seconds)
+    hashes = {
+        comment_id: content_hash(comment["text"])
+        for comment_id, comment in batch.items()
+    }
+    unchanged = {
+        comment["comment_id"]
+        async for comment in db["comments"].find(
+            {
+                "video_id": video_id,
+                "comment_id": {"$in": list(batch)},
+                "status": ProcessingStatus.processed,
+            },
+            {"_id": 0, "comment_id": 1, "content_hash": 1},
+        )
+        if comment.get("content_hash") == hashes[comment["comment_id"]]
+    }
+
+    operations = []
+    for comment_id, comment in batch.items():
+        update = {
+            "votes": comment["votes"],
+            "replies": comment["replies"],
+            "time_posted_raw": comment["time_posted_raw"],
+            "time_posted": comment["time_posted"],
+            "updated_at": current_time.isoformat(),
+        }
+        if comment_id in unchanged:
+            operations.append(
+                UpdateOne(
+                    {"video_id": video_id, "comment_id": comment_id}, {"$set": update}
+                )
+            )
+            continue
+
+        operations.append(
+            UpdateOne(
+                {"video_id": video_id, "comment_id": comment_id},
+                {
+                    "$set": {
+                        **update,
+                        "text": comment["text"],
+                        "content_hash": hashes[comment_id],
+                        "status": ProcessingStatus.pending,
+                        "lease_expires_at": lease_expires_at,
+                        "lease_retries": 0,
+                    },
+                    "$setOnInsert": {
+                        "comment_parent_id": comment["comment_parent_id"],
+                        "created_at": current_time.isoformat(),
+                    },
+                },
+                upsert=True,
+            )
+        )
+
+    result = await db["comments"].bulk_write(operations, ordered=False)
+    inserted = result.upserted_count
+    updated = len(operations) - inserted - len(unchanged)
+    logger.info(
+        f"Wrote batch of {len(operations)} comment(s) for video {video_id}: "
+        f"{inserted} inserted, {updated} updated, {len(unchanged)} unchanged"
+    )
+    increment("comments_unchanged_skipped", len(unchanged))
+
+    await _enqueue_comments_sentiment(
+        db,
+        queue,
+        video_id,
+        [comment_id for comment_id in batch if comment_id not in unchanged],
+    )
+
+    return inserted, updated, len(unchanged)
+
+
+async def _enqueue_comments_sentiment(
+    db: AsyncIOMotorClient, queue: Queue, video_id: str, comment_ids: list[str]
+):
+    settings = get_settings()
+    for start in range(0, len(comment_ids), settings.sentiment_batch_size):
+        chunk = comment_ids[start : start + settings.sentiment_batch_size]
+        job_id = sentiment_job_id(video_id, chunk)
+        # Lets the reaper tell the comments waiting for their job from abandoned ones
+        await db["comments"].update_many(
+            {"video_id": video_id, "comment_id": {"$in": chunk}},
+            {"$set": {"sentiment_job_id": job_id}},
+        )
+        enqueue_unique(
+            queue, job_id, calculate_video_comments_sentiment, video_id, chunk
         )
 
 
 async def calculate_single_video_comment_sentiment(video_id: str, comment_id: str):
     logger.info(f"Processing comment {comment_id} for video {video_id}")
-    settings = get_settings()
-    db: AsyncIOMotorClient = await use_database()
+    db: AsyncIOMotorDatabase = await use_database()
 
     video = await db["videos"].find_one({"video_id": video_id})
     if not video:
@@ -204,17 +666,12 @@ async def calculate_single_video_comment_sentiment(video_id: str, comment_id: st
         return
 
     try:
-        libre_translate = LibreTranslateAPI(settings.libretranslate_url)
-
-        detection = libre_translate.detect(comment["text"])
-        translation: str = comment["text"]
-        if detection[0]["language"] != "en":
-            translation = libre_translate.translate(
-                comment["text"], detection[0]["language"], "en"
-            )
-
-        analyzer = SentimentIntensityAnalyzer()
-        vader_sentiment = analyzer.polarity_scores(translation)
+        [translation] = await translate_to_english(
+            db, get_libretranslate_client(), [comment["text"]]
+        )
+        if translation is None:
+            raise ValueError("Comment could not be translated")
+        vader_sentiment = score(translation)
 
         await db["comments"].update_one(
             {"video_id": video_id, "comment_id": comment_id},
@@ -222,9 +679,20 @@ async def calculate_single_video_comment_sentiment(video_id: str, comment_id: st
                 "$set": {
                     "vader_sentiment": vader_sentiment,
                     "status": ProcessingStatus.processed,
+                    "lease_retries": 0,
                 }
             },
         )
+        await update_video_score(
+            db,
+            video_id,
+            [
+                (
+                    (comment.get("vader_sentiment") or {}).get("compound"),
+                    vader_sentiment["compound"],
+                )
+            ],
+        )
 
     except Exception as e:
         logger.error(f"Error processing comment {comment_id} for video {video_id}: {e}")
@@ -234,3 +702,249 @@ async def calculate_single_video_comment_sentiment(video_id: str, comment_id: st
         )
     else:
         logger.info(f"Finished processing comment {comment_id} for video {video_id}")
+
+
+async def calculate_video_comments_sentiment(
+    video_id: str, comment_ids: list[str] | None = None
+):
+    """Calculate the sentiment of a batch of pending comments of a video.
+
+    Args:
+        video_id: YouTube video ID
+        comment_ids: Comments to process. When omitted, every pending comment of the
+            video is processed.
+    """
+    logger.info(
+        f"Processing {len(comment_ids) if comment_ids is not None else 'all pending'} "
+        f"comment(s) for video {video_id}"
+    )
+    settings = get_settings()
+    db: AsyncIOMotorDatabase = await use_database()
+
+    comments_query: dict = {"video_id": video_id}
+    if comment_ids is not None:
+        comments_query["comment_id"] = {"$in": comment_ids}
+
+    video = await db["videos"].find_one({"video_id": video_id})
+    if not video:
+        logger.error(f"Video {video_id} not found on database.")
+        # We need to clean up the DB if the video doesn't exist anymore
+        await db["comments"].delete_many(comments_query)
+        return
+
+    pending_query = {**comments_query, "status": ProcessingStatus.pending}
+
+    current_time = datetime.now()
+    await db["comments"].update_many(
+        pending_query,
+        {
+            "$set": {
+                "heartbeat_at": current_time.isoformat(),
+                "lease_expires_at": _lease_expiry(
+                    current_time, settings.comment_lease_seconds
+                ),
+            }
+        },
+    )
+
+    try:
+        libretranslate_client = get_libretranslate_client()
+        get_analyzer()
+    except Exception as e:
+        logger.error(f"Error processing comments for video {video_id}: {e}")
+        await db["comments"].update_many(
+            pending_query, {"$set": {"status": ProcessingStatus.failed}}
+        )
+        return
+
+    cursor = db["comments"].find(
+        pending_query, {"comment_id": 1, "text": 1, "vader_sentiment.compound": 1}
+    )
+
+    processed: int = 0
+    failed: int = 0
+    while comments := await cursor.to_list(length=settings.sentiment_batch_size):
+        operations = []
+        score_changes: list[tuple[float | None, float]] = []
+        try:
+            translations = await translate_to_english(
+                db, libretranslate_client, [comment["text"] for comment in comments]
+            )
+            sentiments = iter(
+                score_batch(
+                    [
+                        translation
+                        for translation in translations
+                        if translation is not None
+                    ]
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error processing comments for video {video_id}: {e}")
+            translations = [None] * len(comments)
+        for comment, translation in zip(comments, translations):
+            comment_filter = {"video_id": video_id, "comment_id": comment["comment_id"]}
+            if translation is None:
+                logger.error(
+                    f"Error processing comment {comment['comment_id']} for video {video_id}: "
+                    "comment could not be translated"
+                )
+                operations.append(
+                    UpdateOne(
+                        comment_filter, {"$set": {"status": ProcessingStatus.failed}}
+                    )
+                )
+                failed += 1
+            else:
+                vader_sentiment = next(sentiments)
+                operations.append(
+                    UpdateOne(
+                        comment_filter,
+                        {
+                            "$set": {
+                                "vader_sentiment": vader_sentiment,
+                                "status": ProcessingStatus.processed,
+                                "lease_retries": 0,
+                            }
+                        },
+                    )
+                )
+                score_changes.append(
+                    (
+                        (comment.get("vader_sentiment") or {}).get("compound"),
+                        vader_sentiment["compound"],
+                    )
+                )
+                processed += 1
+
+        await db["comments"].bulk_write(operations, ordered=False)
+        await update_video_score(db, video_id, score_changes)
+
+    logger.info(
+        f"Finished processing comments for video {video_id}: "
+        f"{processed} processed, {failed} failed"
+    )
+
+
+async def reap_expired_leases():
+    """Return videos and comments whose lease expired, because the worker handling
+    them died, to be processed again, or mark them as failed once they ran out of
+    retries.
+
+    Items whose job is still queued or running are left alone, they are only waiting
+    for a worker, e.g. on a backlogged queue.
+    """
+    logger.info("Started looking for expired leases")
+    settings = get_settings()
+    db: AsyncIOMotorClient = await use_database()
+
+    current_time = datetime.now()
+    retryable = {
+        "$or": [
+            {"lease_retries": {"$exists": False}},
+            {"lease_retries": {"$lt": settings.lease_max_retries}},
+        ]
+    }
+    exhausted = {"lease_retries": {"$gte": settings.lease_max_retries}}
+
+    expired_videos_query: dict = {
+        "status": ProcessingStatus.processing,
+        "$or": [
+            {"lease_expires_at": {"$lt": current_time.isoformat()}},
+            # Videos claimed before leases existed
+            {
+                "lease_expires_at": {"$exists": False},
+                "updated_at": {
+                    "$lt": (
+                        current_time - timedelta(seconds=settings.video_lease_seconds)
+                    ).isoformat()
+                },
+            },
+        ],
+    }
+    expired_videos_query["video_id"] = {
+        "$nin": [
+            video["video_id"]
+            async for video in db["videos"].find(
+                expired_videos_query, {"video_id": 1, "generation": 1}
+            )
+            if is_job_pending(
+                background_queue,
+                pull_job_id(video["video_id"], video.get("generation", 0)),
+            )
+        ]
+    }
+    requeued_videos = await db["videos"].update_many(
+        {"$and": [expired_videos_query, retryable]},
+        {
+            "$set": {
+                "status": ProcessingStatus.pending,
+                "updated_at": current_time.isoformat(),
+            },
+            "$inc": {"lease_retries": 1},
+            "$unset": {"claim_token": "", "lease_expires_at": ""},
+        },
+    )
+    failed_videos = await db["videos"].update_many(
+        {"$and": [expired_videos_query, exhausted]},
+        {
+            "$set": {
+                "status": ProcessingStatus.failed,
+                "updated_at": current_time.isoformat(),
+            },
+            "$unset": {"claim_token": "", "lease_expires_at": ""},
+        },
+    )
+
+    expired_comments_query: dict = {
+        "status": ProcessingStatus.pending,
+        "lease_expires_at": {"$lt": current_time.isoformat()},
+    }
+    expired_comments_query["sentiment_job_id"] = {
+        "$nin": [
+            job_id
+            for job_id in await db["comments"].distinct(
+                "sentiment_job_id", expired_comments_query
+            )
+            if job_id is not None and is_job_pending(background_queue, job_id)
+        ]
+    }
+    claim_token = uuid4().hex
+    await db["comments"].update_many(
+        {"$and": [expired_comments_query, retryable]},
+        {
+            "$set": {
+                "claim_token": claim_token,
+                "lease_expires_at": _lease_expiry(
+                    current_time, settings.comment_lease_seconds
+                ),
+            },
+            "$inc": {"lease_retries": 1},
+        },
+    )
+    failed_comments = await db["comments"].update_many(
+        {"$and": [expired_comments_query, exhausted]},
+        {"$set": {"status": ProcessingStatus.failed}},
+    )
+
+    comment_ids_by_video: dict[str, list[str]] = {}
+    async for comment in db["comments"].find(
+        {"claim_token": claim_token}, {"video_id": 1, "comment_id": 1}
+    ):
+        comment_ids_by_video.setdefault(comment["video_id"], []).append(
+            comment["comment_id"]
+        )
+    for video_id, comment_ids in comment_ids_by_video.items():
+        await _enqueue_comments_sentiment(db, background_queue, video_id, comment_ids)
+    requeued_comments = sum(len(ids) for ids in comment_ids_by_video.values())
+
+    increment("reaped_videos_requeued", requeued_videos.modified_count)
+    increment("reaped_videos_failed", failed_videos.modified_count)
+    increment("reaped_comments_requeued", requeued_comments)
+    increment("reaped_comments_failed", failed_comments.modified_count)
+    logger.info(
+        f"Reaped expired leases: {requeued_videos.modified_count} video(s) and "
+        f"{requeued_comments} comment(s) requeued, "
+        f"{failed_videos.modified_count} video(s) and "
+        f"{failed_comments.modified_count} comment(s) failed"
+    )
@@ -0,0 +1,290 @@
+import asyncio
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from typing import Any
+
+import httpx
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from yt_thumbsense.cache import TTLCache
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.language import is_english
+
+TRANSLATIONS_COLLECTION = "translations"
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+settings = get_settings()
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """Cache of language detections and English translations keyed by the hash of
+    the normalized text.
+
+    Lookups go through a bounded in-process LRU first and then through a MongoDB
+    collection shared by every worker, whose entries expire through a TTL index.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.local_hits: int = 0
+        self.shared_hits: int = 0
+        self.misses: int = 0
+
+    async def get_many(
+        self, db: AsyncIOMotorDatabase, hashes: set[str]
+    ) -> dict[str, dict]:
+        found: dict[str, dict] = {}
+        for hash_ in hashes:
+            entry = self.local.get(hash_)
+            if entry is not None:
+                found[hash_] = entry
+        self.local_hits += len(found)
+
+        missing = hashes - found.keys()
+        if missing:
+            try:
+                async for entry in db[TRANSLATIONS_COLLECTION].find(
+                    {"_id": {"$in": list(missing)}}
+                ):
+                    found[entry["_id"]] = {
+                        "language": entry["language"],
+                        "translation": entry["translation"],
+                    }
+                    self.local.set(entry["_id"], found[entry["_id"]])
+                    self.shared_hits += 1
+            except Exception as e:
+                logger.warning(f"Error reading the translation cache: {e}")
+
+        self.misses += len(hashes - found.keys())
+        return found
+
+    async def set_many(self, db: AsyncIOMotorDatabase, entries: dict[str, dict]):
+        if not entries:
+            return
+
+        for hash_, entry in entries.items():
+            self.local.set(hash_, entry)
+
+        current_time = datetime.now()
+        try:
+            await db[TRANSLATIONS_COLLECTION].bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": hash_},
+                        {"$set": {**entry, "created_at": current_time}},
+                        upsert=True,
+                    )
+                    for hash_, entry in entries.items()
+                ],
+                ordered=False,
+            )
+        except Exception as e:
+            logger.warning(f"Error writing the translation cache: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        self.local.clear()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+
+translation_cache = TranslationCache(
+    maxsize=settings.translation_cache_size,
+    ttl_seconds=settings.translation_cache_ttl_seconds,
+)
+
+
+class LibreTranslateClient:
+    """Asynchronous LibreTranslate client that keeps a pool of persistent
+    connections, bounds the number of concurrent requests and translates texts of
+    the same source language in batches."""
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str | None = None,
+        max_batch_size: int = 50,
+        max_concurrency: int = 8,
+        timeout_seconds: float = 30,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.api_key = api_key
+        self.max_batch_size = max_batch_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=url,
+            timeout=timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            transport=transport,
+        )
+
+    async def _post(self, path: str, payload: dict) -> Any:
+        if self.api_key is not None:
+            payload["api_key"] = self.api_key
+        async with self._semaphore:
+            response = await self._client.post(path, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    async def detect(self, text: str) -> str:
+        detections = await self._post("detect", {"q": text})
+        return detections[0]["language"]
+
+    async def detect_many(self, texts: list[str]) -> list[str | BaseException]:
+        """Detect the language of each text.
+
+        LibreTranslate detects a single language for a whole batch, so every text
+        is sent on its own, concurrently, over the pooled connections.
+        """
+        return await asyncio.gather(
+            *(self.detect(text) for text in texts), return_exceptions=True
+        )
+
+    async def translate_many(
+        self, texts: list[str], source: str, target: str = "en"
+    ) -> list[str]:
+        """Translate texts written in `source` in batches of `max_batch_size`."""
+        batches = [
+            texts[start : start + self.max_batch_size]
+            for start in range(0, len(texts), self.max_batch_size)
+        ]
+        responses = await asyncio.gather(
+            *(
+                self._post(
+                    "translate",
+                    {"q": batch, "source": source, "target": target, "format": "text"},
+                )
+                for batch in batches
+            )
+        )
+        return [
+            translation
+            for response in responses
+            for translation in response["translatedText"]
+        ]
+
+    async def close(self):
+        await self._client.aclose()
+
+
+_libretranslate_client: LibreTranslateClient | None = None
+_libretranslate_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_libretranslate_client() -> LibreTranslateClient:
+    """Return the LibreTranslate client of the running event loop, creating it on
+    first use."""
+    global _libretranslate_client, _libretranslate_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _libretranslate_client is None or _libretranslate_client_loop is not loop:
+        _libretranslate_client = LibreTranslateClient(
+            settings.libretranslate_url,
+            api_key=settings.libretranslate_api_key,
+            max_batch_size=settings.libretranslate_max_batch_size,
+            max_concurrency=settings.libretranslate_max_concurrency,
+            timeout_seconds=settings.libretranslate_timeout_seconds,
+        )
+        _libretranslate_client_loop = loop
+    return _libretranslate_client
+
+
+async def close_libretranslate_client():
+    global _libretranslate_client, _libretranslate_client_loop
+
+    if _libretranslate_client is not None:
+        await _libretranslate_client.close()
+        _libretranslate_client = None
+        _libretranslate_client_loop = None
+
+
+async def translate_to_english(
+    db: AsyncIOMotorDatabase, client: LibreTranslateClient, texts: list[str]
+) -> list[str | None]:
+    """Translate `texts` to English, detecting their languages first.
+
+    Texts confidently detected as English locally are returned as they are, the
+    other detections and translations are served from the translation cache when
+    possible, only the missing ones are requested from LibreTranslate, grouping the
+    translations by source language.
+
+    Returns:
+        The English text for each of `texts`, or None if it couldn't be translated.
+    """
+    english = [settings.local_language_detection and is_english(text) for text in texts]
+    hashes = [text_hash(text) for text in texts]
+    cached = await translation_cache.get_many(
+        db, {hash_ for hash_, is_english_ in zip(hashes, english) if not is_english_}
+    )
+
+    missing: dict[str, str] = {}
+    for text, hash_, is_english_ in zip(texts, hashes, english):
+        if not is_english_ and hash_ not in cached:
+            missing.setdefault(hash_, text)
+
+    translated: dict[str, dict] = {}
+    languages = await client.detect_many(list(missing.values())) if missing else []
+    texts_by_language: dict[str, dict[str, str]] = defaultdict(dict)
+    for (hash_, text), language in zip(missing.items(), languages):
+        if isinstance(language, BaseException):
+            logger.error(f"Error detecting the language of text {hash_}: {language}")
+        elif language == "en":
+            translated[hash_] = {"language": language, "translation": None}
+        else:
+            texts_by_language[language][hash_] = text
+
+    for language, language_texts in texts_by_language.items():
+        try:
+            translations = await client.translate_many(
+                list(language_texts.values()), language
+            )
+        except Exception as e:
+            logger.error(
+                f"Error translating {len(language_texts)} text(s) from {language}: {e}"
+            )
+            continue
+        for hash_, translation in zip(language_texts, translations):
+            translated[hash_] = {"language": language, "translation": translation}
+
+    await translation_cache.set_many(db, translated)
+
+    results: list[str | None] = []
+    for text, hash_, is_english_ in zip(texts, hashes, english):
+        if is_english_:
+            results.append(text)
+            continue
+        entry = cached.get(hash_) or translated.get(hash_)
+        if entry is None:
+            results.append(None)
+        else:
+            results.append(entry["translation"] or text)
+
+    logger.debug(
+        f"Detected {sum(english)}/{len(texts)} text(s) as English locally, "
+        f"translation cache stats: {translation_cache.stats()}"
+    )
+    return results
@@ -1,10 +1,104 @@
+import asyncio
+import re
+from typing import cast
+
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from pytube import YouTube
+from redis import RedisError
+
+from yt_thumbsense.cache import TTLCache
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.worker import redis_conn
+
+YOUTUBE_VIDEO_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{11}")
 
+settings = get_settings()
 
-def is_valid_youtube_video(video_id: str):
+_video_validation_cache = TTLCache(
+    maxsize=settings.youtube_validation_cache_size,
+    ttl=settings.youtube_validation_cache_ttl_seconds,
+)
+
+
+def _fetch_youtube_video(video_id: str) -> bool:
     try:
         url = f"https://www.youtube.com/watch?v={video_id}"
         _ = YouTube(url)
         return True
     except Exception:
         return False
+
+
+def _video_validation_ttl(is_valid: bool) -> int:
+    return (
+        settings.youtube_validation_cache_ttl_seconds
+        if is_valid
+        else settings.youtube_validation_negative_cache_ttl_seconds
+    )
+
+
+async def _cache_video_validation(video_id: str, is_valid: bool):
+    ttl = _video_validation_ttl(is_valid)
+    _video_validation_cache.set(video_id, is_valid, ttl=ttl)
+
+    if settings.youtube_validation_cache_redis:
+        try:
+            await asyncio.to_thread(
+                redis_conn.set,
+                f"{settings.app_name}:youtube_video_valid:{video_id}",
+                int(is_valid),
+                ex=ttl,
+            )
+        except RedisError as e:
+            logger.warning(f"Error caching validation of video {video_id}: {e}")
+
+
+async def _get_cached_video_validation(video_id: str) -> bool | None:
+    is_valid = _video_validation_cache.get(video_id)
+    if is_valid is not None or not settings.youtube_validation_cache_redis:
+        return is_valid
+
+    try:
+        cached = cast(
+            bytes | None,
+            await asyncio.to_thread(
+                redis_conn.get, f"{settings.app_name}:youtube_video_valid:{video_id}"
+            ),
+        )
+    except RedisError as e:
+        logger.warning(f"Error reading cached validation of video {video_id}: {e}")
+        return None
+
+    if cached is None:
+        return None
+
+    is_valid = bool(int(cached))
+    _video_validation_cache.set(video_id, is_valid, ttl=_video_validation_ttl(is_valid))
+    return is_valid
+
+
+async def is_valid_youtube_video(
+    video_id: str, db: AsyncIOMotorDatabase | None = None
+) -> bool:
+    """Check whether `video_id` is an existing YouTube video.
+
+    Malformed IDs are rejected without any I/O, results are cached and IDs already
+    in the videos collection are accepted without asking YouTube. The YouTube
+    request and the shared cache in Redis run in a thread so they don't block the
+    event loop.
+    """
+    if not YOUTUBE_VIDEO_ID_PATTERN.fullmatch(video_id):
+        return False
+
+    is_valid = await _get_cached_video_validation(video_id)
+    if is_valid is not None:
+        return is_valid
+
+    if db is not None and await db.videos.find_one({"video_id": video_id}, {"_id": 1}):
+        is_valid = True
+    else:
+        is_valid = await asyncio.to_thread(_fetch_youtube_video, video_id)
+
+    await _cache_video_validation(video_id, is_valid)
+    return is_valid
@@ -1,17 +1,237 @@
-from redis import Redis
-from rq import Queue
+import asyncio
+import contextlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from loguru import logger
+from redis import Redis, RedisError
+from rq import Queue, SimpleWorker
+from rq.job import Job
+from rq.timeouts import BaseDeathPenalty, JobTimeoutException
+from rq.worker import WorkerStatus
 from rq_scheduler import Scheduler
 
 from yt_thumbsense.config import get_settings
+from yt_thumbsense.database import close_database
+from yt_thumbsense.translation import close_libretranslate_client
 
 settings = get_settings()
 
+# Jobs finished per time bucket, used to estimate how fast the queues drain
+COMPLETIONS_KEY = f"{settings.app_name}:completions"
+COMPLETIONS_BUCKET_SECONDS = 60
+
+_event_loop: asyncio.AbstractEventLoop | None = None
+_event_loop_pid: int | None = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop shared by every job run in the current process."""
+    global _event_loop, _event_loop_pid
+
+    if _event_loop is None or _event_loop_pid != os.getpid():
+        _event_loop = asyncio.new_event_loop()
+        _event_loop_pid = os.getpid()
+    return _event_loop
+
+
+class ThumbsenseJob(Job):
+    """Job that runs coroutines on a long-lived event loop instead of a new loop per
+    job, so loop bound resources like the database client are reused across jobs."""
+
+    def perform(self) -> Any:
+        try:
+            return super().perform()
+        finally:
+            self._record_completion()
+
+    def _record_completion(self):
+        bucket = int(time.time()) // COMPLETIONS_BUCKET_SECONDS
+        key = f"{COMPLETIONS_KEY}:{bucket}"
+        try:
+            pipeline = self.connection.pipeline()
+            pipeline.incr(key)
+            pipeline.expire(
+                key,
+                settings.admission_throughput_window_seconds
+                + COMPLETIONS_BUCKET_SECONDS,
+            )
+            pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Error recording the completion of job {self.id}: {e}")
+
+    def _execute(self) -> Any:
+        if not self.func:
+            raise ValueError("Cannot execute job: function is None")
+        result = self.func(*self.args, **self.kwargs)
+        if not asyncio.iscoroutine(result):
+            return result
+
+        loop = get_event_loop()
+        if loop.is_running():
+            # The loop is run by a ConcurrentWorker in another thread
+            return asyncio.run_coroutine_threadsafe(
+                self._run_with_timeout(result), loop
+            ).result()
+
+        task = loop.create_task(self._run_with_timeout(result))
+        try:
+            return loop.run_until_complete(task)
+        except BaseException:
+            # The signal death penalty of RQ interrupts the loop but not the task,
+            # which would otherwise keep running along the next jobs
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                loop.run_until_complete(task)
+            raise
+
+    async def _run_with_timeout(self, coroutine) -> Any:
+        timeout = self.timeout or Queue.DEFAULT_TIMEOUT
+        if timeout == -1:
+            return await coroutine
+        try:
+            return await asyncio.wait_for(coroutine, timeout)
+        except asyncio.TimeoutError:
+            raise JobTimeoutException(
+                f"Task exceeded maximum timeout value ({timeout} seconds)"
+            )
+
+
+class EventLoopDeathPenalty(BaseDeathPenalty):
+    """Job timeouts of the ConcurrentWorker are enforced on the event loop by
+    ThumbsenseJob, signals can only interrupt the main thread."""
+
+    def setup_death_penalty(self):
+        pass
+
+    def cancel_death_penalty(self):
+        pass
+
+
+class ConcurrentWorker(SimpleWorker):
+    """Worker that runs up to `max_concurrent_jobs` jobs at once on the event loop of
+    the process, for jobs that spend most of their time waiting on the network.
+
+    The event loop runs in its own thread, each job is performed by a thread of a
+    pool that waits for its coroutine, so the usual RQ bookkeeping of success,
+    failure and retries is kept per job.
+    """
+
+    # RQ infers the type of the attribute from its UnixSignalDeathPenalty default
+    death_penalty_class = EventLoopDeathPenalty  # type: ignore[assignment]
+
+    def __init__(self, *args, max_concurrent_jobs: int = 1, **kwargs):
+        self._local = threading.local()
+        super().__init__(*args, **kwargs)
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self._job_slots = threading.BoundedSemaphore(max_concurrent_jobs)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_jobs, thread_name_prefix="job"
+        )
+
+    # The execution of the job being performed is kept per thread
+    @property
+    def execution(self):
+        return getattr(self._local, "execution", None)
+
+    @execution.setter
+    def execution(self, execution):
+        self._local.execution = execution
+
+    def work(self, *args, **kwargs) -> bool:
+        loop = get_event_loop()
+        loop_thread = threading.Thread(
+            target=loop.run_forever, name="event-loop", daemon=True
+        )
+        loop_thread.start()
+        try:
+            return super().work(*args, **kwargs)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+
+    def dequeue_job_and_maintain_ttl(self, timeout, max_idle_time=None):
+        # Only take a job from the queue when it can be started right away
+        while not self._job_slots.acquire(timeout=self.job_monitoring_interval):
+            self.heartbeat()
+
+        result = super().dequeue_job_and_maintain_ttl(timeout, max_idle_time)
+        if result is None:
+            self._job_slots.release()
+        else:
+            self.set_state(WorkerStatus.BUSY)
+        return result
+
+    def execute_job(self, job: Job, queue: Queue):
+        self._executor.submit(self._perform_job, job, queue)
+
+    def _perform_job(self, job: Job, queue: Queue):
+        try:
+            self.prepare_execution(job)
+            self.perform_job(job, queue)
+        except Exception:
+            self.log.exception("Worker %s: error performing job %s", self.key, job.id)
+        finally:
+            self._job_slots.release()
+
+    def teardown(self):
+        # Warm shutdown, let the running jobs finish
+        self._executor.shutdown(wait=True)
+        super().teardown()
+
+
+def close_event_loop():
+    global _event_loop
+
+    if _event_loop is None or _event_loop_pid != os.getpid():
+        return
+
+    _event_loop.run_until_complete(close_database())
+    _event_loop.run_until_complete(close_libretranslate_client())
+    _event_loop.close()
+    _event_loop = None
+
+
 redis_conn = Redis.from_url(settings.redis_url)
-main_queue = Queue("main", connection=redis_conn)
-scheduler = Scheduler(queue=main_queue, connection=redis_conn)
+
+# Queues in the order workers consume them, from the highest priority
+interactive_queue = Queue("interactive", connection=redis_conn, job_class=ThumbsenseJob)
+ingestion_queue = Queue("ingestion", connection=redis_conn, job_class=ThumbsenseJob)
+sentiment_queue = Queue("sentiment", connection=redis_conn, job_class=ThumbsenseJob)
+background_queue = Queue("background", connection=redis_conn, job_class=ThumbsenseJob)
+# Queue used before jobs were split by priority, still drained by the workers
+main_queue = Queue("main", connection=redis_conn, job_class=ThumbsenseJob)
+
+QUEUES = [
+    interactive_queue,
+    ingestion_queue,
+    sentiment_queue,
+    background_queue,
+    main_queue,
+]
+
+scheduler = Scheduler(queue=background_queue, connection=redis_conn)
 
 if __name__ == "__main__":
-    from rq import Worker
+    from yt_thumbsense.sentiment import get_analyzer
+
+    # Load the VADER lexicons before the first job instead of during it
+    get_analyzer()
 
-    worker = Worker([main_queue])
-    worker.work(with_scheduler=True)
+    worker: SimpleWorker
+    if settings.worker_max_concurrent_jobs > 1:
+        worker = ConcurrentWorker(
+            QUEUES,
+            connection=redis_conn,
+            job_class=ThumbsenseJob,
+            max_concurrent_jobs=settings.worker_max_concurrent_jobs,
+        )
+    else:
+        worker = SimpleWorker(QUEUES, connection=redis_conn, job_class=ThumbsenseJob)
+    try:
+        worker.work(with_scheduler=True)
+    finally:
+        close_event_loop()
@@ -0,0 +1,105 @@
+import inspect
+from typing import Iterator
+
+from youtube_comment_downloader import SORT_BY_RECENT, YoutubeCommentDownloader
+
+# Key of the paging position set on the last comment of each page
+CHECKPOINT_KEY = "checkpoint"
+
+
+def _continuation(endpoint: dict) -> dict:
+    """Keep the parts of a continuation endpoint needed to request its page."""
+    return {
+        "commandMetadata": {
+            "webCommandMetadata": {
+                "apiUrl": endpoint["commandMetadata"]["webCommandMetadata"]["apiUrl"]
+            }
+        },
+        "continuationCommand": {"token": endpoint["continuationCommand"]["token"]},
+    }
+
+
+class ResumableCommentDownloader(YoutubeCommentDownloader):
+    """YoutubeCommentDownloader that reports its paging position after each page of
+    comments, so a download can be resumed from there, even by another process.
+
+    The last comment of each page carries the position under `CHECKPOINT_KEY`, to be
+    passed back as `checkpoint` to continue with the next page. Comments are still
+    downloaded and parsed by `YoutubeCommentDownloader`, the position is its list of
+    pending continuations, read from its paging loop before each page is requested.
+    A resumed download loads the video page again, then swaps that list for the
+    checkpointed one when the first page is requested.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Continuations to restore on the first page request of a resumed download
+        self._resume_continuations: list[dict] | None = None
+        # Position before the last page request, not yet set on a comment
+        self._page_checkpoint: dict | None = None
+
+    def get_comments_from_url(
+        self,
+        youtube_url,
+        sort_by=SORT_BY_RECENT,
+        language=None,
+        sleep=0.1,
+        checkpoint: dict | None = None,
+    ) -> Iterator[dict]:
+        self._resume_continuations = (
+            None if checkpoint is None else list(checkpoint["continuations"])
+        )
+        self._page_checkpoint = None
+        comments = super().get_comments_from_url(youtube_url, sort_by, language, sleep)
+        # The last comment of a page is only known once the next page is requested,
+        # so each comment is held back until the following one is downloaded
+        previous: dict | None = None
+        try:
+            for comment in comments:
+                page_checkpoint = self._take_page_checkpoint()
+                if previous is not None:
+                    if page_checkpoint is not None:
+                        previous[CHECKPOINT_KEY] = page_checkpoint
+                    yield previous
+                previous = comment
+        except Exception:
+            if previous is not None:
+                page_checkpoint = self._take_page_checkpoint()
+                if page_checkpoint is not None:
+                    previous[CHECKPOINT_KEY] = page_checkpoint
+                yield previous
+            raise
+        if previous is not None:
+            previous[CHECKPOINT_KEY] = self._take_page_checkpoint() or {
+                "continuations": []
+            }
+            yield previous
+
+    def ajax_request(self, endpoint, ytcfg, retries=5, sleep=20):
+        frame = inspect.currentframe()
+        caller = frame.f_back if frame is not None else None
+        caller_locals = caller.f_locals if caller is not None else {}
+        # Only the requests of the paging loop pop their endpoint from the list of
+        # continuations, e.g. not the retry of the sort menu for community posts
+        if caller_locals.get("continuation") is not endpoint:
+            return super().ajax_request(endpoint, ytcfg, retries, sleep)
+        continuations: list[dict] = caller_locals["continuations"]
+
+        if self._resume_continuations is not None:
+            continuations[:] = self._resume_continuations
+            self._resume_continuations = None
+            if not continuations:
+                return {}  # Resumed after the last page
+            endpoint = continuations.pop()
+
+        self._page_checkpoint = {
+            "continuations": [
+                _continuation(continuation)
+                for continuation in [*continuations, endpoint]
+            ]
+        }
+        return super().ajax_request(endpoint, ytcfg, retries, sleep)
+
+    def _take_page_checkpoint(self) -> dict | None:
+        checkpoint, self._page_checkpoint = self._page_checkpoint, None
+        return checkpoint
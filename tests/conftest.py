@@ -6,5 +6,8 @@ from starlette.testclient import TestClient
 def api_client():
     from yt_thumbsense.main import app
 
+    # The rate limits are shared by every request of the test session
+    app.state.limiter.enabled = False
     client = TestClient(app)
     yield client
+    app.state.limiter.enabled = True
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -8,10 +8,13 @@ from yt_thumbsense.tasks import calculate_single_video_comment_sentiment
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.LibreTranslateAPI", side_effect=None)
+@patch("yt_thumbsense.tasks.get_libretranslate_client")
 async def test_calculate_single_video_comment_sentiment_valid(
-    mock_libre_translate, api_client
+    mock_get_libretranslate_client, api_client
 ):
+    mock_get_libretranslate_client.return_value.detect_many = AsyncMock(
+        return_value=["en"]
+    )
 
     db = await use_database()
 
@@ -1,13 +1,46 @@
 from datetime import datetime
+from unittest.mock import AsyncMock, patch
 
 import pytest
 import pytest_asyncio
 from freezegun import freeze_time
+from mongomock.collection import BulkOperationBuilder
 from mongomock_motor import AsyncMongoMockClient
 
 from yt_thumbsense import database
 from yt_thumbsense.main import app
 from yt_thumbsense.models.request import ProcessingStatus
+from yt_thumbsense.translation import translation_cache
+
+
+@pytest.fixture(autouse=True)
+def mongomock_bulk_write_compat(monkeypatch):
+    """pymongo>=4.11 passes `sort` to the bulk builders, mongomock doesn't accept it."""
+    for method_name in ("add_update", "add_replace"):
+        original = getattr(BulkOperationBuilder, method_name)
+
+        def without_sort(self, *args, _original=original, sort=None, **kwargs):
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(BulkOperationBuilder, method_name, without_sort)
+
+
+@pytest.fixture(autouse=True)
+def clear_translation_cache():
+    translation_cache.clear()
+    yield
+    translation_cache.clear()
+
+
+@pytest.fixture
+def mock_libretranslate_client():
+    with patch("yt_thumbsense.tasks.get_libretranslate_client") as mock_get_client:
+        client = mock_get_client.return_value
+        client.detect_many = AsyncMock(side_effect=lambda texts: ["en"] * len(texts))
+        client.translate_many = AsyncMock(
+            side_effect=lambda texts, source: [f"translated {text}" for text in texts]
+        )
+        yield client
 
 
 @pytest_asyncio.fixture
@@ -24,6 +57,8 @@ async def mock_database(mongo_client):
     yield db
     await db.drop_collection("videos")
     await db.drop_collection("comments")
+    await db.drop_collection("video_scores")
+    await db.drop_collection("translations")
 
 
 today_frozen_time: str = "2024-01-01 12:00:00"
@@ -5,13 +5,14 @@ import pytest
 from freezegun import freeze_time
 from unit.conftest import today_frozen_time
 
+from yt_thumbsense.config import get_settings
 from yt_thumbsense.routers.request import ProcessingStatus
 from yt_thumbsense.tasks import start_single_video
 
 
 @pytest.mark.asyncio
 @patch("yt_thumbsense.routers.request.is_valid_youtube_video", return_value=False)
-@patch("yt_thumbsense.routers.request.main_queue")
+@patch("yt_thumbsense.routers.request.interactive_queue")
 async def test_request_invalid_video_id(
     mock_queue, mock_is_valid_youtube_video, api_client, mock_database
 ):
@@ -27,7 +28,7 @@ async def test_request_invalid_video_id(
 @pytest.mark.asyncio
 @freeze_time(today_frozen_time)
 @patch("yt_thumbsense.routers.request.is_valid_youtube_video", return_value=True)
-@patch("yt_thumbsense.routers.request.main_queue")
+@patch("yt_thumbsense.routers.request.interactive_queue")
 async def test_request_new_video(
     mock_queue, mock_is_valid_youtube_video, api_client, mock_database, mock_video_data
 ):
@@ -44,14 +45,16 @@ async def test_request_new_video(
     assert data["updated_at"] == mock_video_data["updated_at"]
 
     mock_queue.enqueue.assert_called_once_with(
-        start_single_video, mock_video_data["video_id"]
+        start_single_video,
+        mock_video_data["video_id"],
+        job_id=f"start:{mock_video_data['video_id']}:0",
     )
 
 
 @pytest.mark.asyncio
 @freeze_time(today_frozen_time)
 @patch("yt_thumbsense.routers.request.is_valid_youtube_video", return_value=True)
-@patch("yt_thumbsense.routers.request.main_queue")
+@patch("yt_thumbsense.routers.request.interactive_queue")
 async def test_request_existing_pending_video(
     mock_queue, mock_valid_video, api_client, mock_database, mock_video_data
 ):
@@ -74,7 +77,7 @@ async def test_request_existing_pending_video(
 @pytest.mark.asyncio
 @freeze_time(today_frozen_time)
 @patch("yt_thumbsense.routers.request.is_valid_youtube_video", return_value=True)
-@patch("yt_thumbsense.routers.request.main_queue")
+@patch("yt_thumbsense.routers.request.interactive_queue")
 async def test_request_existing_processed_video_expired(
     mock_queue, mock_valid_video, api_client, mock_database, mock_video_data
 ):
@@ -98,14 +101,16 @@ async def test_request_existing_processed_video_expired(
     assert data["updated_at"] == datetime.fromisoformat(today_frozen_time).isoformat()
 
     mock_queue.enqueue.assert_called_once_with(
-        start_single_video, mock_video_data["video_id"]
+        start_single_video,
+        mock_video_data["video_id"],
+        job_id=f"start:{mock_video_data['video_id']}:0",
     )
 
 
 @pytest.mark.asyncio
 @freeze_time(today_frozen_time)
 @patch("yt_thumbsense.routers.request.is_valid_youtube_video", return_value=True)
-@patch("yt_thumbsense.routers.request.main_queue")
+@patch("yt_thumbsense.routers.request.interactive_queue")
 async def test_request_existing_processed_video_not_expired(
     mock_queue, mock_valid_video, api_client, mock_database, mock_video_data
 ):
@@ -126,3 +131,65 @@ async def test_request_existing_processed_video_not_expired(
     assert data["updated_at"] == mock_video_data["updated_at"]
 
     mock_queue.enqueue.assert_not_called()
+
+
+@pytest.mark.asyncio
+@freeze_time(today_frozen_time)
+@patch("yt_thumbsense.routers.request.admission_retry_after", return_value=120)
+@patch("yt_thumbsense.routers.request.is_valid_youtube_video", return_value=True)
+@patch("yt_thumbsense.routers.request.interactive_queue")
+async def test_request_new_video_overloaded(
+    mock_queue,
+    mock_valid_video,
+    mock_admission_retry_after,
+    api_client,
+    mock_database,
+    mock_video_data,
+):
+    """Test requesting a new video while the workers are overloaded."""
+    response = api_client.post(
+        "/request/", json={"video_id": mock_video_data["video_id"]}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "120"
+    assert (
+        await mock_database["videos"].find_one(
+            {"video_id": mock_video_data["video_id"]}
+        )
+        is None
+    )
+    mock_queue.enqueue.assert_not_called()
+
+
+@pytest.mark.asyncio
+@freeze_time(today_frozen_time)
+@patch("yt_thumbsense.routers.request.admission_retry_after", return_value=120)
+@patch("yt_thumbsense.routers.request.is_valid_youtube_video", return_value=True)
+@patch("yt_thumbsense.routers.request.interactive_queue")
+async def test_request_new_video_overloaded_deferred(
+    mock_queue,
+    mock_valid_video,
+    mock_admission_retry_after,
+    api_client,
+    mock_database,
+    mock_video_data,
+):
+    """Test that overloaded requests are left pending for the scheduled sweep."""
+    settings = get_settings().model_copy(update={"admission_overload_action": "defer"})
+    api_client.app.dependency_overrides[get_settings] = lambda: settings
+    try:
+        response = api_client.post(
+            "/request/", json={"video_id": mock_video_data["video_id"]}
+        )
+    finally:
+        api_client.app.dependency_overrides.pop(get_settings)
+
+    assert response.status_code == 202
+    assert response.headers["Retry-After"] == "120"
+    assert response.json()["status"] == ProcessingStatus.pending
+    video = await mock_database["videos"].find_one(
+        {"video_id": mock_video_data["video_id"]}
+    )
+    assert video["status"] == ProcessingStatus.pending
+    mock_queue.enqueue.assert_not_called()
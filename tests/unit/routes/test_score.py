@@ -1,6 +1,6 @@
+import statistics
 from unittest.mock import patch
 
-import pandas as pd
 import pytest
 
 from yt_thumbsense.models.request import ProcessingStatus
@@ -41,14 +41,18 @@ async def test_get_score_valid(
     assert response.json()["video_id"] == "abc123"
     assert response.json()["comment_count"] == 2
 
-    expected_score = pd.DataFrame(
-        [comment["vader_sentiment"] for comment in mock_processed_comments]
-    )
+    compounds = [
+        comment["vader_sentiment"]["compound"] for comment in mock_processed_comments
+    ]
 
-    assert response.json()["sentiment_score"] == expected_score["compound"].mean()
-    assert response.json()["sentiment_score_std"] == expected_score["compound"].std()
-    assert response.json()["sentiment_score_min"] == expected_score["compound"].min()
-    assert response.json()["sentiment_score_max"] == expected_score["compound"].max()
+    assert response.json()["sentiment_score"] == pytest.approx(
+        statistics.mean(compounds)
+    )
+    assert response.json()["sentiment_score_std"] == pytest.approx(
+        statistics.stdev(compounds)
+    )
+    assert response.json()["sentiment_score_min"] == min(compounds)
+    assert response.json()["sentiment_score_max"] == max(compounds)
 
 
 @pytest.mark.asyncio
@@ -83,3 +87,47 @@ async def test_get_score_unprocessed_comments(
     response = api_client.get("/score/video/abc123")
     assert response.status_code == 500
     assert response.json()["detail"] == "Sentiment not calculated for all comments"
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.routers.score.is_valid_youtube_video", return_value=True)
+async def test_get_score_stores_aggregates(
+    mock_is_valid_youtube_video, api_client, mock_database, mock_processed_comments
+):
+    await mock_database.comments.insert_many(mock_processed_comments)
+
+    first_response = api_client.get("/score/video/abc123")
+    await mock_database.comments.delete_many({"video_id": "abc123"})
+    second_response = api_client.get("/score/video/abc123")
+
+    assert second_response.status_code == 200
+    assert second_response.json() == pytest.approx(first_response.json())
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.routers.score.is_valid_youtube_video", return_value=True)
+async def test_get_score_from_aggregates(
+    mock_is_valid_youtube_video, api_client, mock_database
+):
+    await mock_database.video_scores.insert_one(
+        {
+            "video_id": "abc123",
+            "count": 3,
+            "sum": 0.6,
+            "sum_squares": 0.44,
+            "min": -0.2,
+            "max": 0.6,
+        }
+    )
+
+    response = api_client.get("/score/video/abc123")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "video_id": "abc123",
+        "comment_count": 3,
+        "sentiment_score": pytest.approx(0.2),
+        "sentiment_score_std": pytest.approx(0.4),
+        "sentiment_score_min": -0.2,
+        "sentiment_score_max": 0.6,
+    }
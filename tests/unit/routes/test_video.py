@@ -316,3 +316,113 @@ async def test_get_video_comments_empty_list(
     response = api_client.get(f"/video/{mock_video_data['video_id']}/comments")
     assert response.status_code == 200
     assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_list_videos_with_cursor(
+    api_client, mock_database, mock_multiple_video_data
+):
+    """Test walking the videos with the cursors of the pages"""
+    await mock_database.videos.insert_many(mock_multiple_video_data)
+
+    response = api_client.get("/videos?limit=1")
+    assert response.status_code == 200
+    assert [video["video_id"] for video in response.json()] == ["abc"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = api_client.get(f"/videos?limit=1&cursor={cursor}")
+    assert response.status_code == 200
+    assert [video["video_id"] for video in response.json()] == ["def"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = api_client.get(f"/videos?limit=1&sort=newest&cursor={cursor}")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_video_comments_top_with_cursor(
+    api_client, mock_database, mock_video_data, mock_comment
+):
+    """Test walking the comments of a video by votes with the cursors of the pages"""
+    await mock_database.comments.insert_many(
+        [
+            {**mock_comment, "video_id": mock_video_data["video_id"]}
+            | {"comment_id": comment_id, "votes": votes}
+            for comment_id, votes in [("a", 1), ("b", 5), ("c", 1), ("d", 3)]
+        ]
+    )
+
+    comment_ids = []
+    cursor = None
+    while True:
+        url = f"/video/{mock_video_data['video_id']}/comments?sort=top&limit=3"
+        response = api_client.get(url if cursor is None else f"{url}&cursor={cursor}")
+        assert response.status_code == 200
+        comment_ids += [comment["comment_id"] for comment in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert comment_ids == ["b", "d", "c", "a"]
+
+
+@pytest.mark.asyncio
+async def test_get_video_comments_invalid_cursor(
+    api_client, mock_database, mock_video_data
+):
+    response = api_client.get(
+        f"/video/{mock_video_data['video_id']}/comments?cursor=invalid"
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_video_comments_with_fields(
+    api_client, mock_database, mock_video_data, mock_comment
+):
+    """Test selecting the fields of the comments"""
+    await mock_database.comments.insert_one(
+        {**mock_comment, "video_id": mock_video_data["video_id"]}
+    )
+
+    response = api_client.get(
+        f"/video/{mock_video_data['video_id']}/comments"
+        "?fields=comment_id,vader_sentiment"
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "comment_id": mock_comment["comment_id"],
+            "vader_sentiment": mock_comment.get("vader_sentiment"),
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_list_videos_compact(api_client, mock_database, mock_multiple_video_data):
+    """Test listing the videos without validating them"""
+    await mock_database.videos.insert_many(mock_multiple_video_data)
+
+    response = api_client.get("/videos?compact=true&limit=1")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "video_id": mock_multiple_video_data[0]["video_id"],
+            "status": mock_multiple_video_data[0]["status"],
+            "created_at": mock_multiple_video_data[0]["created_at"],
+            "updated_at": mock_multiple_video_data[0]["updated_at"],
+        }
+    ]
+    assert "X-Next-Cursor" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_get_video_comments_unknown_fields(
+    api_client, mock_database, mock_video_data
+):
+    response = api_client.get(
+        f"/video/{mock_video_data['video_id']}/comments?fields=comment_id,claim_token"
+    )
+    assert response.status_code == 400
@@ -0,0 +1,168 @@
+from unittest.mock import patch
+
+import pytest
+
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.models.request import ProcessingStatus
+from yt_thumbsense.tasks import calculate_video_comments_sentiment
+
+
+@pytest.fixture()
+def mock_comments(mock_comment):
+    return [
+        {**mock_comment, "comment_id": comment_id, "text": f"comment {comment_id}"}
+        for comment_id in ("1", "2", "3")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_calculate_video_comments_sentiment_selected_comments(
+    mock_libretranslate_client, mock_database, mock_comments, mock_video_data
+):
+    mock_comments[0]["lease_retries"] = 2
+    await mock_database["videos"].insert_one(mock_video_data)
+    await mock_database["comments"].insert_many(mock_comments)
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await calculate_video_comments_sentiment(
+            mock_video_data["video_id"], ["1", "2"]
+        )
+
+    comments = {
+        comment["comment_id"]: comment
+        async for comment in mock_database["comments"].find(
+            {"video_id": mock_video_data["video_id"]}
+        )
+    }
+
+    assert comments["1"]["status"] == ProcessingStatus.processed
+    assert comments["1"].get("vader_sentiment") is not None
+    assert comments["1"]["lease_retries"] == 0
+    assert comments["2"]["status"] == ProcessingStatus.processed
+    assert comments["3"]["status"] == ProcessingStatus.pending
+
+    video_score = await mock_database["video_scores"].find_one(
+        {"video_id": mock_video_data["video_id"]}
+    )
+    assert video_score["count"] == 2
+
+    mock_libretranslate_client.detect_many.assert_called_once_with(
+        ["comment 1", "comment 2"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_calculate_video_comments_sentiment_all_pending(
+    mock_libretranslate_client, mock_database, mock_comments, mock_video_data
+):
+    mock_comments[0]["status"] = ProcessingStatus.processed
+    await mock_database["videos"].insert_one(mock_video_data)
+    await mock_database["comments"].insert_many(mock_comments)
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        with patch("yt_thumbsense.tasks.get_settings") as mock_get_settings:
+            mock_get_settings.return_value = get_settings().model_copy(
+                update={"sentiment_batch_size": 1}
+            )
+            await calculate_video_comments_sentiment(mock_video_data["video_id"])
+
+    comments = await (
+        mock_database["comments"]
+        .find({"video_id": mock_video_data["video_id"]})
+        .to_list(length=None)
+    )
+
+    assert all(comment["status"] == ProcessingStatus.processed for comment in comments)
+    assert [
+        text
+        for call in mock_libretranslate_client.detect_many.call_args_list
+        for text in call.args[0]
+    ] == ["comment 2", "comment 3"]
+
+
+@pytest.mark.asyncio
+async def test_calculate_video_comments_sentiment_video_not_found(
+    mock_libretranslate_client, mock_database, mock_comments
+):
+    await mock_database["comments"].insert_many(mock_comments)
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await calculate_video_comments_sentiment(
+            mock_comments[0]["video_id"], ["1", "2"]
+        )
+
+    remaining_comments = await (
+        mock_database["comments"]
+        .find({"video_id": mock_comments[0]["video_id"]})
+        .to_list(length=None)
+    )
+
+    assert [comment["comment_id"] for comment in remaining_comments] == ["3"]
+    mock_libretranslate_client.detect_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_calculate_video_comments_sentiment_partially_failed(
+    mock_libretranslate_client, mock_database, mock_comments, mock_video_data
+):
+    await mock_database["videos"].insert_one(mock_video_data)
+    await mock_database["comments"].insert_many(mock_comments)
+
+    mock_libretranslate_client.detect_many.side_effect = None
+    mock_libretranslate_client.detect_many.return_value = ["en", Exception(), "en"]
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await calculate_video_comments_sentiment(mock_video_data["video_id"])
+
+    comments = {
+        comment["comment_id"]: comment
+        async for comment in mock_database["comments"].find(
+            {"video_id": mock_video_data["video_id"]}
+        )
+    }
+
+    assert comments["1"]["status"] == ProcessingStatus.processed
+    assert comments["2"]["status"] == ProcessingStatus.failed
+    assert comments["3"]["status"] == ProcessingStatus.processed
+
+
+@pytest.mark.asyncio
+async def test_calculate_video_comments_sentiment_translation_failed(
+    mock_libretranslate_client, mock_database, mock_comments, mock_video_data
+):
+    await mock_database["videos"].insert_one(mock_video_data)
+    await mock_database["comments"].insert_many(mock_comments)
+
+    mock_libretranslate_client.detect_many.side_effect = Exception
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await calculate_video_comments_sentiment(mock_video_data["video_id"])
+
+    comments = await (
+        mock_database["comments"]
+        .find({"video_id": mock_video_data["video_id"]})
+        .to_list(length=None)
+    )
+
+    assert all(comment["status"] == ProcessingStatus.failed for comment in comments)
+
+
+@pytest.mark.asyncio
+async def test_calculate_video_comments_sentiment_rescored_comments(
+    mock_libretranslate_client, mock_database, mock_comments, mock_video_data
+):
+    await mock_database["videos"].insert_one(mock_video_data)
+    await mock_database["comments"].insert_many(mock_comments)
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await calculate_video_comments_sentiment(mock_video_data["video_id"])
+        await mock_database["comments"].update_many(
+            {"video_id": mock_video_data["video_id"]},
+            {"$set": {"status": ProcessingStatus.pending}},
+        )
+        await calculate_video_comments_sentiment(mock_video_data["video_id"])
+
+    video_score = await mock_database["video_scores"].find_one(
+        {"video_id": mock_video_data["video_id"]}
+    )
+    assert video_score["count"] == 3
@@ -3,11 +3,16 @@ from unittest.mock import patch
 import dateparser
 import pytest
 from freezegun import freeze_time
+from mongomock_motor import AsyncMongoMockCollection
 from unit.conftest import today_frozen_time
+from youtube_comment_downloader import SORT_BY_POPULAR, SORT_BY_RECENT
 
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.jobs import sentiment_job_id
 from yt_thumbsense.models.request import ProcessingStatus
+from yt_thumbsense.sentiment import content_hash
 from yt_thumbsense.tasks import (
-    calculate_single_video_comment_sentiment,
+    calculate_video_comments_sentiment,
     pull_video_comments_from_youtube,
 )
 
@@ -61,8 +66,8 @@ def mock_youtube_comment_with_edition_wrong():
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.main_queue")
-@patch("yt_thumbsense.tasks.YoutubeCommentDownloader")
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
 @freeze_time(today_frozen_time)
 async def test_pull_video_comments_from_youtube_valid(
     mock_youtube_downloader,
@@ -105,15 +110,18 @@ async def test_pull_video_comments_from_youtube_valid(
         assert inserted_comment["status"] == ProcessingStatus.pending
 
         mock_queue.enqueue.assert_called_once_with(
-            calculate_single_video_comment_sentiment,
+            calculate_video_comments_sentiment,
             mock_video_data["video_id"],
-            inserted_comment["comment_id"],
+            [inserted_comment["comment_id"]],
+            job_id=sentiment_job_id(
+                mock_video_data["video_id"], [inserted_comment["comment_id"]]
+            ),
         )
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.main_queue")
-@patch("yt_thumbsense.tasks.YoutubeCommentDownloader")
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
 @freeze_time(today_frozen_time)
 async def test_pull_video_comments_from_youtube_valid_with_parent_comment(
     mock_youtube_downloader,
@@ -163,15 +171,18 @@ async def test_pull_video_comments_from_youtube_valid_with_parent_comment(
         assert inserted_comment["status"] == ProcessingStatus.pending
 
         mock_queue.enqueue.assert_called_once_with(
-            calculate_single_video_comment_sentiment,
+            calculate_video_comments_sentiment,
             mock_video_data["video_id"],
-            inserted_comment["comment_id"],
+            [inserted_comment["comment_id"]],
+            job_id=sentiment_job_id(
+                mock_video_data["video_id"], [inserted_comment["comment_id"]]
+            ),
         )
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.main_queue")
-@patch("yt_thumbsense.tasks.YoutubeCommentDownloader")
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
 @freeze_time(today_frozen_time)
 async def test_pull_video_comments_from_youtube_valid_with_edited_comment(
     mock_youtube_downloader,
@@ -222,8 +233,8 @@ async def test_pull_video_comments_from_youtube_valid_with_edited_comment(
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.main_queue")
-@patch("yt_thumbsense.tasks.YoutubeCommentDownloader")
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
 @freeze_time(today_frozen_time)
 async def test_pull_video_comments_from_youtube_invalid_with_edited_comment(
     mock_youtube_downloader,
@@ -276,8 +287,8 @@ async def test_pull_video_comments_from_youtube_invalid_with_edited_comment(
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.main_queue")
-@patch("yt_thumbsense.tasks.YoutubeCommentDownloader")
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
 @freeze_time(today_frozen_time)
 async def test_pull_video_comments_from_youtube_not_in_database(
     mock_youtube_downloader,
@@ -292,8 +303,8 @@ async def test_pull_video_comments_from_youtube_not_in_database(
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.main_queue")
-@patch("yt_thumbsense.tasks.YoutubeCommentDownloader")
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
 @freeze_time(today_frozen_time)
 async def test_pull_video_comments_from_youtube_failed(
     mock_youtube_downloader, mock_queue, mock_database, mock_video_data
@@ -317,8 +328,35 @@ async def test_pull_video_comments_from_youtube_failed(
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.main_queue")
-@patch("yt_thumbsense.tasks.YoutubeCommentDownloader")
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
+@freeze_time(today_frozen_time)
+async def test_pull_video_comments_from_youtube_claimed_again(
+    mock_youtube_downloader, mock_queue, mock_database, mock_video_data
+):
+    """Test that a pull enqueued for an older claim of the video gives up."""
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await mock_database["videos"].insert_one(
+            {
+                **mock_video_data,
+                "status": ProcessingStatus.processing,
+                "generation": 2,
+            }
+        )
+
+        await pull_video_comments_from_youtube(mock_video_data["video_id"], 1)
+
+    mock_youtube_downloader.return_value.get_comments.assert_not_called()
+    video = await mock_database["videos"].find_one(
+        {"video_id": mock_video_data["video_id"]}
+    )
+    assert video["status"] == ProcessingStatus.processing
+    assert "heartbeat_at" not in video
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
 @freeze_time(today_frozen_time)
 async def test_max_comments_reached(
     mock_youtube_downloader,
@@ -334,7 +372,9 @@ async def test_max_comments_reached(
 
     with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
         with patch("yt_thumbsense.tasks.get_settings") as mock_get_settings:
-            mock_get_settings.return_value.max_comments_per_video = 1
+            mock_get_settings.return_value = get_settings().model_copy(
+                update={"max_comments_per_video": 1}
+            )
             await mock_database["videos"].insert_one(mock_video_data)
             await pull_video_comments_from_youtube(mock_video_data["video_id"])
 
@@ -357,3 +397,358 @@ async def test_max_comments_reached(
             )
 
             assert len(inserted_video_comments) == 1
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
+@freeze_time(today_frozen_time)
+async def test_pull_video_comments_from_youtube_batches_writes(
+    mock_youtube_downloader,
+    mock_queue,
+    mock_database,
+    mock_video_data,
+):
+    mock_youtube_downloader.return_value.get_comments.return_value = [
+        {
+            "cid": f"comment_{index}",
+            "text": f"comment {index}",
+            "votes": index,
+            "replies": 0,
+            "reply": False,
+            "time": "1 hour ago",
+        }
+        for index in range(5)
+    ]
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        with patch("yt_thumbsense.tasks.get_settings") as mock_get_settings:
+            mock_get_settings.return_value = get_settings().model_copy(
+                update={"comments_bulk_write_batch_size": 2}
+            )
+            await mock_database["videos"].insert_one(mock_video_data)
+
+            with patch.object(
+                AsyncMongoMockCollection,
+                "bulk_write",
+                autospec=True,
+                side_effect=AsyncMongoMockCollection.bulk_write,
+            ) as mock_bulk_write:
+                await pull_video_comments_from_youtube(mock_video_data["video_id"])
+
+    assert [len(call.args[1]) for call in mock_bulk_write.call_args_list] == [2, 2, 1]
+    assert all(
+        call.kwargs["ordered"] is False for call in mock_bulk_write.call_args_list
+    )
+
+    inserted_video_comments = (
+        await mock_database["comments"]
+        .find({"video_id": mock_video_data["video_id"]})
+        .to_list(length=None)
+    )
+    assert len(inserted_video_comments) == 5
+    assert [call.args[2] for call in mock_queue.enqueue.call_args_list] == [
+        ["comment_0", "comment_1"],
+        ["comment_2", "comment_3"],
+        ["comment_4"],
+    ]
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
+@freeze_time(today_frozen_time)
+async def test_pull_video_comments_from_youtube_updates_existing_comment(
+    mock_youtube_downloader,
+    mock_queue,
+    mock_database,
+    mock_video_data,
+    mock_comment,
+    mock_youtube_comment_single,
+):
+    mock_comment["status"] = ProcessingStatus.processed
+    mock_comment["lease_retries"] = 2
+    mock_youtube_comment_single["votes"] = 42
+    mock_youtube_downloader.return_value.get_comments.return_value = [
+        mock_youtube_comment_single
+    ]
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await mock_database["videos"].insert_one(mock_video_data)
+        await mock_database["comments"].insert_one(mock_comment)
+
+        await pull_video_comments_from_youtube(mock_video_data["video_id"])
+
+    updated_comments = (
+        await mock_database["comments"]
+        .find({"video_id": mock_video_data["video_id"]})
+        .to_list(length=None)
+    )
+
+    assert len(updated_comments) == 1
+    assert updated_comments[0]["votes"] == 42
+    assert updated_comments[0]["status"] == ProcessingStatus.pending
+    assert updated_comments[0]["lease_retries"] == 0
+    assert updated_comments[0]["created_at"] == mock_comment["created_at"]
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.tasks.background_queue")
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
+async def test_pull_video_comments_from_youtube_background_sweep(
+    mock_youtube_downloader,
+    mock_sentiment_queue,
+    mock_background_queue,
+    mock_database,
+    mock_video_data,
+    mock_youtube_comment_single,
+):
+    mock_youtube_downloader.return_value.get_comments.return_value = [
+        mock_youtube_comment_single
+    ]
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await mock_database["videos"].insert_one(mock_video_data)
+        await pull_video_comments_from_youtube(
+            mock_video_data["video_id"], background=True
+        )
+
+    mock_sentiment_queue.enqueue.assert_not_called()
+    mock_background_queue.enqueue.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
+@freeze_time(today_frozen_time)
+async def test_pull_video_comments_from_youtube_checkpoints(
+    mock_youtube_downloader, mock_queue, mock_database, mock_video_data
+):
+    """Test that an interrupted ingestion keeps its checkpoint to resume from."""
+    state = {"continuations": [{"token": "page_2"}]}
+
+    def get_comments(*args, **kwargs):
+        yield {"cid": "comment_0", "text": "comment 0", "time": "1 hour ago"}
+        yield {
+            "cid": "comment_1",
+            "text": "comment 1",
+            "time": "1 hour ago",
+            "checkpoint": state,
+        }
+        yield {"cid": "comment_2", "text": "comment 2", "time": "1 hour ago"}
+        raise ConnectionError
+
+    mock_youtube_downloader.return_value.get_comments.side_effect = get_comments
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        with patch("yt_thumbsense.tasks.get_settings") as mock_get_settings:
+            mock_get_settings.return_value = get_settings().model_copy(
+                update={"comments_bulk_write_batch_size": 2}
+            )
+            await mock_database["videos"].insert_one(
+                {**mock_video_data, "status": ProcessingStatus.processing}
+            )
+            await pull_video_comments_from_youtube(mock_video_data["video_id"])
+
+    video = await mock_database["videos"].find_one(
+        {"video_id": mock_video_data["video_id"]}
+    )
+    assert video["status"] == ProcessingStatus.pending
+    assert video["lease_retries"] == 1
+    assert video["ingestion_checkpoint"]["state"] == state
+    assert video["ingestion_checkpoint"]["amount_loaded"] == 2
+    assert "checkpoint" not in await mock_database["comments"].find_one(
+        {"comment_id": "comment_1"}
+    )
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
+@freeze_time(today_frozen_time)
+async def test_pull_video_comments_from_youtube_resumes_from_checkpoint(
+    mock_youtube_downloader,
+    mock_queue,
+    mock_database,
+    mock_video_data,
+    mock_youtube_comment_single,
+):
+    """Test that ingestion resumes from the checkpoint left on the video."""
+    state = {"continuations": [{"token": "page_2"}]}
+    mock_youtube_downloader.return_value.get_comments.return_value = [
+        {**mock_youtube_comment_single, "cid": "comment_2"},
+        {**mock_youtube_comment_single, "cid": "comment_3"},
+    ]
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        with patch("yt_thumbsense.tasks.get_settings") as mock_get_settings:
+            mock_get_settings.return_value = get_settings().model_copy(
+                update={"max_comments_per_video": 3}
+            )
+            await mock_database["videos"].insert_one(
+                {
+                    **mock_video_data,
+                    "ingestion_checkpoint": {
+                        "state": state,
+                        "amount_loaded": 2,
+                        "updated_at": mock_video_data["updated_at"],
+                    },
+                }
+            )
+            await pull_video_comments_from_youtube(mock_video_data["video_id"])
+
+    mock_youtube_downloader.return_value.get_comments.assert_called_once_with(
+        mock_video_data["video_id"], sort_by=SORT_BY_POPULAR, checkpoint=state
+    )
+    video = await mock_database["videos"].find_one(
+        {"video_id": mock_video_data["video_id"]}
+    )
+    assert video["status"] == ProcessingStatus.processed
+    assert "ingestion_checkpoint" not in video
+    # Only one more comment fits after the 2 loaded before the checkpoint
+    assert [
+        comment["comment_id"]
+        async for comment in mock_database["comments"].find(
+            {"video_id": mock_video_data["video_id"]}
+        )
+    ] == ["comment_2"]
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
+@freeze_time(today_frozen_time)
+async def test_pull_video_comments_from_youtube_incremental_refresh(
+    mock_youtube_downloader,
+    mock_queue,
+    mock_database,
+    mock_video_data,
+    mock_comment,
+):
+    """Test that re-pulling a video only writes its new comments and refreshes the
+    votes of its popular ones."""
+    for comment_id in ("known_1", "known_2", "known_3"):
+        await mock_database["comments"].insert_one(
+            {
+                **mock_comment,
+                "video_id": mock_video_data["video_id"],
+                "comment_id": comment_id,
+                "status": ProcessingStatus.processed,
+            }
+        )
+
+    def youtube_comment(comment_id: str, votes: int = 1) -> dict:
+        return {
+            "cid": comment_id,
+            "text": comment_id,
+            "votes": votes,
+            "time": "1 hour ago",
+        }
+
+    def get_comments(video_id, sort_by, checkpoint=None):
+        if sort_by == SORT_BY_RECENT:
+            return iter(
+                [
+                    youtube_comment("new_1"),
+                    youtube_comment("known_1"),
+                    youtube_comment("new_2"),
+                    youtube_comment("known_2"),
+                    youtube_comment("known_3"),
+                    # Older than the watermark, never reached
+                    youtube_comment("old_1"),
+                ]
+            )
+        return iter(
+            [
+                youtube_comment("known_3", votes=42),
+                youtube_comment("new_1", votes=7),
+                youtube_comment("known_1", votes=30),
+            ]
+        )
+
+    mock_youtube_downloader.return_value.get_comments.side_effect = get_comments
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        with patch("yt_thumbsense.tasks.get_settings") as mock_get_settings:
+            mock_get_settings.return_value = get_settings().model_copy(
+                update={
+                    "incremental_refresh_known_streak": 2,
+                    "incremental_refresh_top_comments": 2,
+                }
+            )
+            await mock_database["videos"].insert_one(
+                {**mock_video_data, "pulled_at": mock_video_data["updated_at"]}
+            )
+            await pull_video_comments_from_youtube(mock_video_data["video_id"])
+
+    comments = {
+        comment["comment_id"]: comment
+        async for comment in mock_database["comments"].find(
+            {"video_id": mock_video_data["video_id"]}
+        )
+    }
+    assert set(comments) == {"known_1", "known_2", "known_3", "new_1", "new_2"}
+    assert comments["new_1"]["status"] == ProcessingStatus.pending
+    assert comments["new_2"]["status"] == ProcessingStatus.pending
+    assert comments["known_3"]["votes"] == 42
+    assert comments["known_3"]["status"] == ProcessingStatus.processed
+    # Outside the top comments
+    assert comments["known_1"]["votes"] == mock_comment["votes"]
+    assert comments["known_1"]["status"] == ProcessingStatus.processed
+
+    video = await mock_database["videos"].find_one(
+        {"video_id": mock_video_data["video_id"]}
+    )
+    assert video["status"] == ProcessingStatus.processed
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.tasks.sentiment_queue")
+@patch("yt_thumbsense.tasks.ResumableCommentDownloader")
+@freeze_time(today_frozen_time)
+async def test_pull_video_comments_from_youtube_skips_unchanged_comments(
+    mock_youtube_downloader,
+    mock_queue,
+    mock_database,
+    mock_video_data,
+    mock_comment,
+):
+    """Test that comments whose text didn't change keep their sentiment."""
+    for comment_id, text in (("unchanged", "same text"), ("edited", "old text")):
+        await mock_database["comments"].insert_one(
+            {
+                **mock_comment,
+                "video_id": mock_video_data["video_id"],
+                "comment_id": comment_id,
+                "text": text,
+                "content_hash": content_hash(text),
+                "status": ProcessingStatus.processed,
+            }
+        )
+    mock_youtube_downloader.return_value.get_comments.return_value = [
+        {"cid": "unchanged", "text": "same  text", "votes": 9, "time": "1 hour ago"},
+        {"cid": "edited", "text": "new text", "votes": 1, "time": "1 hour ago"},
+    ]
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await mock_database["videos"].insert_one(mock_video_data)
+        await pull_video_comments_from_youtube(mock_video_data["video_id"])
+
+    comments = {
+        comment["comment_id"]: comment
+        async for comment in mock_database["comments"].find(
+            {"video_id": mock_video_data["video_id"]}
+        )
+    }
+    assert comments["unchanged"]["status"] == ProcessingStatus.processed
+    assert comments["unchanged"]["votes"] == 9
+    assert comments["edited"]["status"] == ProcessingStatus.pending
+    assert comments["edited"]["content_hash"] == content_hash("new text")
+
+    mock_queue.enqueue.assert_called_once_with(
+        calculate_video_comments_sentiment,
+        mock_video_data["video_id"],
+        ["edited"],
+        job_id=sentiment_job_id(mock_video_data["video_id"], ["edited"]),
+    )
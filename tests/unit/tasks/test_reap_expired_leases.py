@@ -0,0 +1,146 @@
+from unittest.mock import call, patch
+
+import pytest
+from freezegun import freeze_time
+from unit.conftest import today_frozen_time
+
+from yt_thumbsense.jobs import pull_job_id, sentiment_job_id
+from yt_thumbsense.models.request import ProcessingStatus
+from yt_thumbsense.tasks import calculate_video_comments_sentiment, reap_expired_leases
+
+
+@pytest.fixture()
+def mock_expired_videos(mock_multiple_video_data):
+    return [
+        {
+            **video,
+            "status": ProcessingStatus.processing,
+            "claim_token": "dead-worker",
+            "lease_expires_at": "2024-01-01T11:00:00",
+        }
+        for video in mock_multiple_video_data
+    ]
+
+
+@pytest.mark.asyncio
+@freeze_time(today_frozen_time)
+@patch("yt_thumbsense.tasks.increment")
+@patch("yt_thumbsense.tasks.background_queue")
+async def test_reap_expired_leases_videos(
+    mock_queue, mock_increment, mock_database, mock_expired_videos
+):
+    mock_expired_videos[1]["lease_retries"] = 3
+    await mock_database.videos.insert_many(
+        mock_expired_videos
+        + [
+            {
+                **mock_expired_videos[0],
+                "video_id": "alive",
+                "lease_expires_at": "2024-01-01T13:00:00",
+            }
+        ]
+    )
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await reap_expired_leases()
+
+    videos = {video["video_id"]: video async for video in mock_database.videos.find({})}
+    assert videos["abc"]["status"] == ProcessingStatus.pending
+    assert videos["abc"]["lease_retries"] == 1
+    assert "claim_token" not in videos["abc"]
+    assert videos["def"]["status"] == ProcessingStatus.failed
+    assert videos["alive"]["status"] == ProcessingStatus.processing
+
+    mock_increment.assert_any_call("reaped_videos_requeued", 1)
+    mock_increment.assert_any_call("reaped_videos_failed", 1)
+
+
+@pytest.mark.asyncio
+@freeze_time(today_frozen_time)
+@patch("yt_thumbsense.tasks.increment")
+@patch("yt_thumbsense.tasks.background_queue")
+async def test_reap_expired_leases_comments(
+    mock_queue, mock_increment, mock_database, mock_comment
+):
+    expired_comment = {**mock_comment, "lease_expires_at": "2024-01-01T11:00:00"}
+    await mock_database.comments.insert_many(
+        [
+            {**expired_comment, "comment_id": "1"},
+            {**expired_comment, "comment_id": "2", "lease_retries": 3},
+            {
+                **expired_comment,
+                "comment_id": "3",
+                "status": ProcessingStatus.processed,
+            },
+            {
+                **mock_comment,
+                "comment_id": "4",
+                "lease_expires_at": "2024-01-01T13:00:00",
+            },
+        ]
+    )
+
+    with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
+        await reap_expired_leases()
+
+    comments = {
+        comment["comment_id"]: comment
+        async for comment in mock_database.comments.find({})
+    }
+    assert comments["1"]["status"] == ProcessingStatus.pending
+    assert comments["1"]["lease_expires_at"] > today_frozen_time
+    assert comments["2"]["status"] == ProcessingStatus.failed
+    assert comments["3"]["status"] == ProcessingStatus.processed
+    assert comments["4"]["status"] == ProcessingStatus.pending
+
+    assert mock_queue.enqueue.call_args_list == [
+        call(
+            calculate_video_comments_sentiment,
+            mock_comment["video_id"],
+            ["1"],
+            job_id=sentiment_job_id(mock_comment["video_id"], ["1"]),
+        )
+    ]
+    mock_increment.assert_any_call("reaped_comments_requeued", 1)
+    mock_increment.assert_any_call("reaped_comments_failed", 1)
+
+
+@pytest.mark.asyncio
+@freeze_time(today_frozen_time)
+@patch("yt_thumbsense.tasks.increment")
+@patch("yt_thumbsense.tasks.background_queue")
+async def test_reap_expired_leases_skips_queued_jobs(
+    mock_queue, mock_increment, mock_database, mock_expired_videos, mock_comment
+):
+    """Test that items waiting on a backlogged queue past their lease are kept."""
+    queued_job_ids = {
+        pull_job_id(mock_expired_videos[0]["video_id"], 1),
+        sentiment_job_id(mock_comment["video_id"], ["1"]),
+    }
+    await mock_database.videos.insert_one({**mock_expired_videos[0], "generation": 1})
+    await mock_database.comments.insert_one(
+        {
+            **mock_comment,
+            "comment_id": "1",
+            "lease_expires_at": "2024-01-01T11:00:00",
+            "lease_retries": 3,
+            "sentiment_job_id": sentiment_job_id(mock_comment["video_id"], ["1"]),
+        }
+    )
+
+    with (
+        patch("yt_thumbsense.tasks.use_database", return_value=mock_database),
+        patch(
+            "yt_thumbsense.tasks.is_job_pending",
+            side_effect=lambda queue, job_id: job_id in queued_job_ids,
+        ),
+    ):
+        await reap_expired_leases()
+
+    video = await mock_database.videos.find_one({})
+    assert video["status"] == ProcessingStatus.processing
+    assert "lease_retries" not in video
+    comment = await mock_database.comments.find_one({})
+    assert comment["status"] == ProcessingStatus.pending
+    assert comment["lease_retries"] == 3
+    mock_queue.enqueue.assert_not_called()
@@ -5,14 +5,15 @@ import pytest
 from freezegun import freeze_time
 from unit.conftest import today_frozen_time
 
+from yt_thumbsense.config import get_settings
 from yt_thumbsense.models.request import ProcessingStatus
-from yt_thumbsense.tasks import start_pending_videos
+from yt_thumbsense.tasks import claim_pending_videos, start_pending_videos
 
 
 @pytest.mark.asyncio
 @freeze_time(today_frozen_time)
 @patch("yt_thumbsense.tasks.pull_video_comments_from_youtube")
-@patch("yt_thumbsense.tasks.main_queue")
+@patch("yt_thumbsense.tasks.background_queue")
 async def test_start_pending_videos_valid(
     mock_queue, mock_pull_video_comments_from_youtube, mock_database, mock_video_data
 ):
@@ -22,7 +23,11 @@ async def test_start_pending_videos_valid(
         await start_pending_videos()
 
     mock_queue.enqueue.assert_called_once_with(
-        mock_pull_video_comments_from_youtube, mock_video_data["video_id"]
+        mock_pull_video_comments_from_youtube,
+        mock_video_data["video_id"],
+        1,
+        background=True,
+        job_id=f"pull:{mock_video_data['video_id']}:1",
     )
 
     inserted_video = await mock_database.videos.find(
@@ -33,12 +38,56 @@ async def test_start_pending_videos_valid(
         inserted_video["updated_at"]
         == datetime.fromisoformat(today_frozen_time).isoformat()
     )
+    assert inserted_video["claim_token"]
+    assert inserted_video["lease_expires_at"] > inserted_video["updated_at"]
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.main_queue")
+@patch("yt_thumbsense.tasks.background_queue")
 async def test_start_pending_videos_no_pending_videos(mock_queue, mock_database):
     with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
         await start_pending_videos()
 
     mock_queue.enqueue.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.tasks.background_queue")
+async def test_start_pending_videos_max_claims_per_run(
+    mock_queue, mock_database, mock_multiple_video_data, mock_video_data
+):
+    await mock_database.videos.insert_many(
+        mock_multiple_video_data + [{**mock_video_data, "video_id": "ghi"}]
+    )
+
+    with (
+        patch("yt_thumbsense.tasks.use_database", return_value=mock_database),
+        patch("yt_thumbsense.tasks.get_settings") as mock_get_settings,
+    ):
+        mock_get_settings.return_value = get_settings().model_copy(
+            update={
+                "pending_videos_claim_batch_size": 1,
+                "pending_videos_max_claims_per_run": 2,
+            }
+        )
+        await start_pending_videos()
+
+    assert mock_queue.enqueue.call_count == 2
+    assert (
+        await mock_database.videos.count_documents({"status": ProcessingStatus.pending})
+        == 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_claim_pending_videos_claims_once(
+    mock_database, mock_multiple_video_data
+):
+    await mock_database.videos.insert_many(mock_multiple_video_data)
+
+    first_claim = await claim_pending_videos(mock_database, "first", limit=10)
+    second_claim = await claim_pending_videos(mock_database, "second", limit=10)
+
+    assert sorted(video["video_id"] for video in first_claim) == ["abc", "def"]
+    assert all(video["generation"] == 1 for video in first_claim)
+    assert second_claim == []
@@ -12,7 +12,7 @@ from yt_thumbsense.tasks import start_single_video
 @pytest.mark.asyncio
 @freeze_time(today_frozen_time)
 @patch("yt_thumbsense.tasks.pull_video_comments_from_youtube")
-@patch("yt_thumbsense.tasks.main_queue")
+@patch("yt_thumbsense.tasks.ingestion_queue")
 async def test_start_single_video_valid(
     mock_queue, mock_process_video, mock_database, mock_video_data
 ):
@@ -22,7 +22,10 @@ async def test_start_single_video_valid(
         await start_single_video(video_id=mock_video_data["video_id"])
 
     mock_queue.enqueue.assert_called_once_with(
-        mock_process_video, mock_video_data["video_id"]
+        mock_process_video,
+        mock_video_data["video_id"],
+        1,
+        job_id=f"pull:{mock_video_data['video_id']}:1",
     )
 
     # Check if the video status was updated
@@ -39,7 +42,7 @@ async def test_start_single_video_valid(
 @pytest.mark.asyncio
 @freeze_time(today_frozen_time)
 @patch("yt_thumbsense.tasks.pull_video_comments_from_youtube")
-@patch("yt_thumbsense.tasks.main_queue")
+@patch("yt_thumbsense.tasks.ingestion_queue")
 async def test_start_single_video_not_pending(
     mock_queue, mock_process_video, mock_database, mock_video_data
 ):
@@ -52,7 +55,7 @@ async def test_start_single_video_not_pending(
 
 
 @pytest.mark.asyncio
-@patch("yt_thumbsense.tasks.main_queue")
+@patch("yt_thumbsense.tasks.ingestion_queue")
 async def test_start_single_video_not_found(mock_queue, mock_database):
     with patch("yt_thumbsense.tasks.use_database", return_value=mock_database):
         await start_single_video(video_id="non-existing-video")
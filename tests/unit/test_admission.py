@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+from redis import ConnectionError
+
+from yt_thumbsense.admission import admission_retry_after
+from yt_thumbsense.config import get_settings
+
+
+@patch("yt_thumbsense.admission.get_throughput", return_value=None)
+@patch("yt_thumbsense.admission.get_admission_backlog", return_value=10)
+def test_admission_retry_after_admits_under_threshold(mock_backlog, mock_throughput):
+    assert admission_retry_after() is None
+
+
+@patch("yt_thumbsense.admission.get_admission_backlog", side_effect=ConnectionError)
+def test_admission_retry_after_fails_open(mock_backlog):
+    assert admission_retry_after() is None
+
+
+@patch("yt_thumbsense.admission.settings")
+@patch("yt_thumbsense.admission.get_admission_wait_seconds", return_value=400)
+@patch("yt_thumbsense.admission.get_throughput", return_value=2.0)
+@patch("yt_thumbsense.admission.get_admission_backlog", return_value=1300)
+def test_admission_retry_after_drain_time(
+    mock_backlog, mock_throughput, mock_wait, mock_settings
+):
+    mock_settings.admission_max_queue_depth = 5000
+    mock_settings.admission_max_drain_seconds = 600
+    mock_settings.admission_throughput_window_seconds = 300
+    mock_settings.admission_max_retry_after_seconds = 3600
+
+    # 2 jobs/s drain 1200 jobs in 10 minutes, the 101 extra ones take 51s
+    assert admission_retry_after() == 51
+
+    mock_backlog.return_value = 1199
+    assert admission_retry_after() is None
+
+
+@patch("yt_thumbsense.admission.settings")
+@patch("yt_thumbsense.admission.get_throughput", return_value=0.0)
+@patch("yt_thumbsense.admission.get_admission_backlog", return_value=5000)
+def test_admission_retry_after_without_throughput(
+    mock_backlog, mock_throughput, mock_settings
+):
+    mock_settings.admission_max_queue_depth = 5000
+    mock_settings.admission_max_drain_seconds = 600
+    mock_settings.admission_max_retry_after_seconds = 300
+
+    assert admission_retry_after() == 300
+
+
+@patch("yt_thumbsense.admission.settings")
+@patch("yt_thumbsense.admission.get_admission_wait_seconds", return_value=5)
+@patch("yt_thumbsense.admission.get_throughput", return_value=1 / 300)
+@patch("yt_thumbsense.admission.get_admission_backlog", return_value=20)
+def test_admission_retry_after_idle_workers(
+    mock_backlog, mock_throughput, mock_wait, mock_settings
+):
+    mock_settings.admission_max_queue_depth = 5000
+    mock_settings.admission_max_drain_seconds = 900
+    mock_settings.admission_throughput_window_seconds = 300
+    mock_settings.admission_max_retry_after_seconds = 3600
+
+    # A single job finished by idle workers isn't their capacity
+    assert admission_retry_after() is None
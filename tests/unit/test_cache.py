@@ -0,0 +1,38 @@
+from freezegun import freeze_time
+
+from yt_thumbsense.cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_cache_expires_entries():
+    with freeze_time("2024-01-01 12:00:00") as frozen_time:
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=600)
+
+        frozen_time.tick(120)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+
+def test_ttl_cache_counts_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", False)
+
+    assert cache.get("a") is False
+    assert cache.get("b", "default") == "default"
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,64 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from limits.storage import MemoryStorage
+from limits.strategies import STRATEGIES
+from redis import ConnectionError
+from starlette.testclient import TestClient
+
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.core import limiter
+from yt_thumbsense.main import app
+
+
+def memory_limiter():
+    return STRATEGIES[get_settings().rate_limit_strategy](MemoryStorage())
+
+
+@pytest.fixture
+def limited_client():
+    """Client of the app with fresh limits, kept in memory instead of Redis."""
+    with (
+        patch.object(limiter, "_limiter", memory_limiter()),
+        patch.object(limiter, "_fallback_limiter", memory_limiter()),
+        patch.object(limiter, "_storage_dead", False),
+    ):
+        yield TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_default(limited_client, mock_database):
+    settings = get_settings()
+    max_requests = int(settings.rate_limits[0].split("/")[0])
+
+    responses = [
+        limited_client.get("/video/non-existing-video") for _ in range(max_requests + 1)
+    ]
+
+    assert {response.status_code for response in responses[:-1]} == {404}
+    assert responses[-1].status_code == 429
+
+
+def test_rate_limits_request(limited_client):
+    settings = get_settings()
+    max_requests = int(settings.request_rate_limits[0].split("/")[0])
+
+    responses = [
+        limited_client.post("/request/", json={"video_id": "invalid"})
+        for _ in range(max_requests + 1)
+    ]
+
+    assert {response.status_code for response in responses[:-1]} == {400}
+    assert responses[-1].status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_without_redis(limited_client, mock_database):
+    redis_limiter = MagicMock()
+    redis_limiter.hit.side_effect = ConnectionError
+
+    with patch.object(limiter, "_limiter", redis_limiter):
+        response = limited_client.get("/video/non-existing-video")
+
+    assert response.status_code == 404
+    redis_limiter.hit.assert_called_once()
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from yt_thumbsense import database
+
+
+@pytest.mark.asyncio
+async def test_use_database_reuses_client():
+    try:
+        first_db = await database.use_database()
+        second_db = await database.use_database()
+
+        assert first_db.client is second_db.client
+        assert first_db.client.get_io_loop() is asyncio.get_running_loop()
+    finally:
+        await database.close_database()
+
+
+def test_get_client_recreated_for_new_event_loop():
+    async def current_client():
+        return database.get_client()
+
+    try:
+        first_client = asyncio.run(current_client())
+        second_client = asyncio.run(current_client())
+
+        assert first_client is not second_client
+    finally:
+        asyncio.run(database.close_database())
+
+
+@pytest.mark.asyncio
+async def test_close_database():
+    client = database.get_client()
+
+    await database.close_database()
+
+    assert database.get_client() is not client
+    await database.close_database()
@@ -0,0 +1,74 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from yt_thumbsense.indexes import (
+    REQUIRED_INDEXES,
+    _report_index_build_progress,
+    check_indexes,
+    ensure_indexes,
+)
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_creates_required_indexes(mock_database):
+    failed = await ensure_indexes(mock_database)
+
+    assert failed == []
+    for collection_name, indexes in REQUIRED_INDEXES.items():
+        existing_indexes = await mock_database[collection_name].index_information()
+        for index in indexes:
+            assert index.document["name"] in existing_indexes
+
+    assert await check_indexes(mock_database) == []
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_is_idempotent(mock_database):
+    await ensure_indexes(mock_database)
+    failed = await ensure_indexes(mock_database)
+
+    assert failed == []
+    assert await check_indexes(mock_database) == []
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_duplicated_videos(mock_database, mock_video_data):
+    await mock_database.videos.insert_many([dict(mock_video_data), mock_video_data])
+
+    failed = await ensure_indexes(mock_database)
+
+    assert failed == ["video_id_unique"]
+
+
+@pytest.mark.asyncio
+async def test_check_indexes_missing(mock_database):
+    warnings = await check_indexes(mock_database)
+
+    assert "Missing index video_id_unique on videos" in warnings
+    assert "Missing index video_id_comment_id_unique on comments" in warnings
+
+
+@pytest.mark.asyncio
+async def test_check_indexes_redundant(mock_database):
+    await ensure_indexes(mock_database)
+    await mock_database.comments.create_index("video_id", name="video_id")
+
+    warnings = await check_indexes(mock_database)
+
+    assert warnings == [
+        "Index video_id on comments is redundant, it is a prefix of "
+        "video_id_comment_id_unique"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_report_index_build_progress_filters_collection():
+    db = MagicMock()
+    db.client.admin.command = AsyncMock(side_effect=[{"inprog": []}, Exception])
+
+    await _report_index_build_progress(db, "comments", interval_seconds=0)
+
+    db.client.admin.command.assert_any_await(
+        {"currentOp": 1, "command.createIndexes": "comments"}
+    )
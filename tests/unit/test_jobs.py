@@ -0,0 +1,77 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from rq.exceptions import NoSuchJobError
+from rq.job import JobStatus
+
+from yt_thumbsense.jobs import enqueue_unique, is_job_pending, sentiment_job_id
+
+
+def task(video_id: str):
+    pass
+
+
+@pytest.fixture
+def mock_queue():
+    queue = MagicMock()
+    queue.connection.set.return_value = True
+    queue.fetch_job.return_value = None
+    return queue
+
+
+def test_sentiment_job_id_ignores_order():
+    assert sentiment_job_id("abc", ["1", "2"]) == sentiment_job_id("abc", ["2", "1"])
+    assert sentiment_job_id("abc", ["1", "2"]) != sentiment_job_id("abc", ["1"])
+
+
+@patch("yt_thumbsense.jobs.increment")
+def test_enqueue_unique(mock_increment, mock_queue):
+    job = enqueue_unique(mock_queue, "pull:abc:1", task, "abc")
+
+    assert job is mock_queue.enqueue.return_value
+    mock_queue.enqueue.assert_called_once_with(task, "abc", job_id="pull:abc:1")
+    mock_queue.connection.delete.assert_called_once()
+    mock_increment.assert_called_once_with("jobs_enqueue_requests")
+
+
+@pytest.mark.parametrize("status", [JobStatus.QUEUED, JobStatus.STARTED])
+@patch("yt_thumbsense.jobs.increment")
+def test_enqueue_unique_pending_duplicate(mock_increment, mock_queue, status):
+    mock_queue.fetch_job.return_value = MagicMock()
+    mock_queue.fetch_job.return_value.get_status.return_value = status
+
+    assert enqueue_unique(mock_queue, "pull:abc:1", task, "abc") is None
+    mock_queue.enqueue.assert_not_called()
+    mock_increment.assert_called_with("jobs_deduplicated")
+
+
+@patch("yt_thumbsense.jobs.increment")
+def test_enqueue_unique_finished_job(mock_increment, mock_queue):
+    mock_queue.fetch_job.return_value = MagicMock()
+    mock_queue.fetch_job.return_value.get_status.return_value = JobStatus.FINISHED
+
+    assert enqueue_unique(mock_queue, "pull:abc:1", task, "abc") is not None
+
+
+@patch("yt_thumbsense.jobs.increment")
+def test_enqueue_unique_concurrent_enqueue(mock_increment, mock_queue):
+    mock_queue.connection.set.return_value = None
+
+    assert enqueue_unique(mock_queue, "pull:abc:1", task, "abc") is None
+    mock_queue.fetch_job.assert_not_called()
+    mock_queue.connection.delete.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "status, pending", [(JobStatus.QUEUED, True), (JobStatus.FAILED, False)]
+)
+def test_is_job_pending(mock_queue, status, pending):
+    mock_queue.job_class.fetch.return_value.get_status.return_value = status
+
+    assert is_job_pending(mock_queue, "sent:abc:1") is pending
+
+
+def test_is_job_pending_missing_job(mock_queue):
+    mock_queue.job_class.fetch.side_effect = NoSuchJobError
+
+    assert not is_job_pending(mock_queue, "sent:abc:1")
@@ -0,0 +1,55 @@
+import pytest
+
+from yt_thumbsense.language import confusion_report, english_confidence, is_english
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "This is the best video I have seen in a long time",
+        "I don't know why but I love this so much",
+        "Thank you for the video, it was really helpful!",
+    ],
+)
+def test_is_english(text):
+    assert is_english(text, threshold=0.8)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Muito obrigado pelo vídeo, ficou excelente",
+        "Me encanta este video, muchas gracias",
+        "Das ist wirklich ein tolles Video",
+        "Dit is wat ik over de video wil weten, want het is goed",
+        "Het is in orde, want ik was er al",
+        "Er will in die Stadt, was is los",
+        "on a fait une video",
+        "素晴らしい動画です",
+        "lol",
+        "🔥🔥🔥",
+        "",
+    ],
+)
+def test_is_not_english(text):
+    assert not is_english(text, threshold=0.8)
+
+
+def test_english_confidence_needs_evidence():
+    assert 0 < english_confidence("the") < english_confidence("the best")
+
+
+def test_confusion_report():
+    report = confusion_report(
+        ["this is the best", "this is the best", "gracias amigo", "gracias", "oi"],
+        ["en", "es", "es", "en", None],
+        threshold=0.8,
+    )
+
+    assert report["local_en/remote_en"] == 1
+    assert report["local_en/remote_other"] == 1
+    assert report["local_deferred/remote_other"] == 1
+    assert report["local_deferred/remote_en"] == 1
+    assert report["remote_failed"] == 1
+    assert report["skipped_detections"] == 0.5
+    assert report["precision"] == 0.5
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from redis import ConnectionError
+
+from yt_thumbsense.metrics import (
+    METRICS_KEY,
+    get_metrics,
+    get_queue_gauges,
+    get_queue_wait_seconds,
+    get_throughput,
+    increment,
+)
+from yt_thumbsense.worker import COMPLETIONS_KEY
+
+
+@patch("yt_thumbsense.metrics.redis_conn")
+def test_increment(mock_redis_conn):
+    increment("reaped_videos_requeued", 2)
+    increment("reaped_videos_failed", 0)
+
+    mock_redis_conn.hincrby.assert_called_once_with(
+        METRICS_KEY, "reaped_videos_requeued", 2
+    )
+
+
+@patch("yt_thumbsense.metrics.redis_conn")
+def test_get_metrics(mock_redis_conn):
+    mock_redis_conn.hgetall.return_value = {b"reaped_videos_requeued": b"2"}
+
+    assert get_metrics() == {"reaped_videos_requeued": 2}
+
+
+@patch("yt_thumbsense.metrics.redis_conn")
+def test_metrics_ignore_redis_errors(mock_redis_conn):
+    mock_redis_conn.hincrby.side_effect = ConnectionError
+    mock_redis_conn.hgetall.side_effect = ConnectionError
+
+    increment("reaped_videos_requeued")
+    assert get_metrics() == {}
+
+
+def test_get_queue_gauges():
+    waiting_queue = MagicMock(count=2)
+    waiting_queue.name = "interactive"
+    waiting_queue.get_job_ids.return_value = ["start:abc:0"]
+    waiting_queue.fetch_job.return_value.enqueued_at = datetime.now(
+        timezone.utc
+    ).replace(tzinfo=None) - timedelta(seconds=30)
+    empty_queue = MagicMock(count=0)
+    empty_queue.name = "background"
+    empty_queue.get_job_ids.return_value = []
+
+    with patch("yt_thumbsense.metrics.QUEUES", [waiting_queue, empty_queue]):
+        gauges = get_queue_gauges()
+
+    assert gauges["queue_depth:interactive"] == 2
+    assert 30 <= gauges["queue_wait_seconds:interactive"] < 60
+    assert gauges["queue_depth:background"] == 0
+    assert gauges["queue_wait_seconds:background"] == 0
+
+
+def test_get_queue_wait_seconds_missing_job():
+    queue = MagicMock()
+    queue.get_job_ids.return_value = ["start:abc:0"]
+    queue.fetch_job.return_value = None
+
+    assert get_queue_wait_seconds(queue) == 0
+
+
+@patch("yt_thumbsense.metrics.time.time", return_value=600.0)
+@patch("yt_thumbsense.metrics.redis_conn")
+def test_get_throughput(mock_redis_conn, mock_time):
+    mock_redis_conn.mget.return_value = [b"60", None, b"120"]
+
+    assert get_throughput(180) == 1.0
+    mock_redis_conn.mget.assert_called_once_with(
+        [f"{COMPLETIONS_KEY}:7", f"{COMPLETIONS_KEY}:8", f"{COMPLETIONS_KEY}:9"]
+    )
@@ -0,0 +1,42 @@
+import pytest
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+from yt_thumbsense.pagination import after_filter, decode_cursor, encode_cursor
+
+TOP_SORT_KEY = [("votes", DESCENDING), ("_id", DESCENDING)]
+
+
+def test_cursor_round_trip():
+    document = {"_id": ObjectId(), "votes": 3, "text": "comment 1"}
+
+    cursor = encode_cursor("top", document, TOP_SORT_KEY)
+
+    assert decode_cursor(cursor, "top", TOP_SORT_KEY) == [3, document["_id"]]
+
+
+@pytest.mark.parametrize("cursor", ["invalid", "e30=", "W10="])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "top", TOP_SORT_KEY)
+
+
+def test_decode_cursor_of_other_sort():
+    cursor = encode_cursor("oldest", {"_id": ObjectId()}, [("_id", ASCENDING)])
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "newest", [("_id", DESCENDING)])
+
+
+def test_after_filter():
+    comment_id = ObjectId()
+
+    assert after_filter([("_id", ASCENDING)], [comment_id]) == {
+        "_id": {"$gt": comment_id}
+    }
+    assert after_filter(TOP_SORT_KEY, [3, comment_id]) == {
+        "$or": [
+            {"votes": {"$lt": 3}},
+            {"votes": 3, "_id": {"$lt": comment_id}},
+        ]
+    }
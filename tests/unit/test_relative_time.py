@@ -0,0 +1,50 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import dateparser
+import pytest
+
+from yt_thumbsense.relative_time import parse_relative_time
+
+REFERENCE_TIME = datetime(2024, 3, 31, 12, 0, 0)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "1 second ago",
+        "45 seconds ago",
+        "1 minute ago",
+        "1 hour ago",
+        "10 hours ago (edited)",
+        "3 days ago",
+        "2 weeks ago",
+        "1 month ago",
+        "5 months ago (edited)",
+        "2 years ago",
+    ],
+)
+def test_parse_relative_time_matches_dateparser(text):
+    expected = dateparser.parse(
+        text.replace("(edited)", ""), settings={"RELATIVE_BASE": REFERENCE_TIME}
+    )
+
+    assert parse_relative_time(text, REFERENCE_TIME) == expected
+
+
+def test_parse_relative_time_falls_back_to_dateparser():
+    assert parse_relative_time("yesterday", REFERENCE_TIME) == datetime(
+        2024, 3, 30, 12, 0, 0
+    )
+    assert parse_relative_time("xx hour ago (edited)", REFERENCE_TIME) is None
+
+
+@patch("yt_thumbsense.relative_time.dateparser.parse")
+def test_parse_relative_time_is_memoized(mock_parse):
+    mock_parse.return_value = datetime(2024, 3, 30, 0, 0, 0)
+
+    for seconds in (0, 30, 59):
+        parse_relative_time("il y a 1 jour", REFERENCE_TIME.replace(second=seconds))
+    parse_relative_time("il y a 1 jour", REFERENCE_TIME.replace(minute=1))
+
+    assert mock_parse.call_count == 2
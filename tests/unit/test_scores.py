@@ -0,0 +1,147 @@
+import statistics
+
+import pytest
+
+from yt_thumbsense.models.request import ProcessingStatus
+from yt_thumbsense.scores import (
+    aggregate_video_score,
+    get_video_score,
+    recompute_video_score,
+    save_video_score,
+    score_statistics,
+    update_video_score,
+)
+
+
+async def insert_scored_comments(db, mock_comment, compounds: dict[str, float]):
+    await db.comments.insert_many(
+        [
+            {
+                **mock_comment,
+                "comment_id": comment_id,
+                "status": ProcessingStatus.processed,
+                "vader_sentiment": {"compound": compound},
+            }
+            for comment_id, compound in compounds.items()
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_video_score_new_comments(mock_database, mock_comment):
+    await insert_scored_comments(mock_database, mock_comment, {"1": 0.5, "2": -0.2})
+    await update_video_score(mock_database, "abc", [(None, 0.5), (None, -0.2)])
+    await insert_scored_comments(mock_database, mock_comment, {"3": 0.1})
+    await update_video_score(mock_database, "abc", [(None, 0.1)])
+
+    video_score = await get_video_score(mock_database, "abc")
+    statistics_ = score_statistics(video_score)
+
+    assert statistics_["comment_count"] == 3
+    assert statistics_["sentiment_score"] == pytest.approx(
+        statistics.mean([0.5, -0.2, 0.1])
+    )
+    assert statistics_["sentiment_score_std"] == pytest.approx(
+        statistics.stdev([0.5, -0.2, 0.1])
+    )
+    assert statistics_["sentiment_score_min"] == -0.2
+    assert statistics_["sentiment_score_max"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_update_video_score_rescored_comment(mock_database, mock_comment):
+    await insert_scored_comments(mock_database, mock_comment, {"1": 0.9, "2": 0.1})
+    await update_video_score(mock_database, "abc", [(None, 0.9), (None, 0.1)])
+
+    # Comment 1 went from 0.9 to 0.3 so the max has to be rebuilt
+    await mock_database.comments.update_one(
+        {"comment_id": "1"}, {"$set": {"vader_sentiment": {"compound": 0.3}}}
+    )
+    await update_video_score(mock_database, "abc", [(0.9, 0.3)])
+
+    statistics_ = score_statistics(await get_video_score(mock_database, "abc"))
+
+    assert statistics_["comment_count"] == 2
+    assert statistics_["sentiment_score"] == pytest.approx(0.2)
+    assert statistics_["sentiment_score_min"] == 0.1
+    assert statistics_["sentiment_score_max"] == 0.3
+
+
+@pytest.mark.asyncio
+async def test_update_video_score_without_aggregates(mock_database, mock_comment):
+    """Test that a video scored before the aggregates existed keeps its comments."""
+    await insert_scored_comments(
+        mock_database, mock_comment, {str(i): -0.9 for i in range(100)}
+    )
+    await insert_scored_comments(mock_database, mock_comment, {"new": 0.8})
+
+    await update_video_score(mock_database, "abc", [(None, 0.8)])
+
+    statistics_ = score_statistics(await get_video_score(mock_database, "abc"))
+    assert statistics_["comment_count"] == 101
+    assert statistics_["sentiment_score"] == pytest.approx((100 * -0.9 + 0.8) / 101)
+
+
+@pytest.mark.asyncio
+async def test_save_video_score_concurrent_update(mock_database, mock_comment):
+    await insert_scored_comments(mock_database, mock_comment, {"1": 0.5})
+    await update_video_score(mock_database, "abc", [(None, 0.5)])
+    current = await mock_database.video_scores.find_one({"video_id": "abc"})
+
+    # Folded in between the read of `current` and the save of stale aggregates
+    await insert_scored_comments(mock_database, mock_comment, {"2": 0.1})
+    await update_video_score(mock_database, "abc", [(None, 0.1)])
+    stale = {"count": 1, "sum": 0.5, "sum_squares": 0.25, "min": 0.5, "max": 0.5}
+
+    assert not await save_video_score(mock_database, "abc", stale, current)
+    assert (await get_video_score(mock_database, "abc"))["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_score_statistics_single_comment(mock_database, mock_comment):
+    await insert_scored_comments(mock_database, mock_comment, {"1": 0.5})
+    await update_video_score(mock_database, "abc", [(None, 0.5)])
+
+    statistics_ = score_statistics(await get_video_score(mock_database, "abc"))
+
+    assert statistics_["sentiment_score"] == 0.5
+    assert statistics_["sentiment_score_std"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_recompute_video_score_without_comments(mock_database):
+    await update_video_score(mock_database, "abc", [(None, 0.5)])
+
+    assert await recompute_video_score(mock_database, "abc") is None
+    assert await get_video_score(mock_database, "abc") is None
+
+
+@pytest.mark.asyncio
+async def test_aggregate_video_score(mock_database, mock_comment):
+    await mock_database.comments.insert_many(
+        [
+            {**mock_comment, "comment_id": "1", "vader_sentiment": {"compound": 0.5}},
+            {**mock_comment, "comment_id": "2", "vader_sentiment": {"compound": -0.2}},
+            {**mock_comment, "comment_id": "3"},
+            {**mock_comment, "video_id": "other", "vader_sentiment": {"compound": 1}},
+        ]
+    )
+
+    video_score = await aggregate_video_score(
+        mock_database,
+        {"video_id": mock_comment["video_id"], "status": ProcessingStatus.pending},
+    )
+
+    assert video_score == {
+        "comment_count": 3,
+        "count": 2,
+        "sum": pytest.approx(0.3),
+        "sum_squares": pytest.approx(0.29),
+        "min": -0.2,
+        "max": 0.5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_aggregate_video_score_without_comments(mock_database):
+    assert await aggregate_video_score(mock_database, {"video_id": "abc"}) is None
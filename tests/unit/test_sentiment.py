@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+from yt_thumbsense.sentiment import content_hash, get_analyzer, score, score_batch
+
+
+def test_get_analyzer_is_shared():
+    assert get_analyzer() is get_analyzer()
+
+
+def test_score_batch():
+    scores = score_batch(["I love this video", "I hate this video"])
+
+    assert scores[0]["compound"] > 0
+    assert scores[1]["compound"] < 0
+    assert scores[0] == score("I love this video")
+
+
+def test_score_batch_memoizes_repeated_texts():
+    analyzer = get_analyzer()
+    with patch.object(
+        analyzer, "polarity_scores", wraps=analyzer.polarity_scores
+    ) as mock_polarity_scores:
+        scores = score_batch(["great video", " great  video", "bad video"])
+
+    assert mock_polarity_scores.call_count == 2
+    assert scores[0] == scores[1]
+    assert scores[0] is not scores[1]
+
+
+def test_content_hash():
+    assert content_hash("Great  video\n") == content_hash("Great video")
+    assert content_hash("Great video") != content_hash("Bad video")
+
+    current_hash = content_hash("Great video")
+    with patch("yt_thumbsense.sentiment.SCORING_VERSION", "vader-next"):
+        assert content_hash("Great video") != current_hash
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+from contextlib import aclosing
+
+import pytest
+
+from yt_thumbsense.streaming import stream_in_thread
+
+
+@pytest.mark.asyncio
+async def test_stream_in_thread():
+    producer_threads = set()
+
+    def items():
+        for item in range(10):
+            producer_threads.add(threading.current_thread())
+            yield item
+
+    assert [item async for item in stream_in_thread(items(), maxsize=2)] == list(
+        range(10)
+    )
+    assert threading.current_thread() not in producer_threads
+
+
+@pytest.mark.asyncio
+async def test_stream_in_thread_raises_producer_errors():
+    def items():
+        yield 1
+        raise ConnectionError("YouTube is down")
+
+    received = []
+    with pytest.raises(ConnectionError):
+        async for item in stream_in_thread(items(), maxsize=2):
+            received.append(item)
+    assert received == [1]
+
+
+@pytest.mark.asyncio
+async def test_stream_in_thread_stops_producer():
+    produced = []
+    closed = threading.Event()
+
+    def items():
+        try:
+            for item in range(1000):
+                produced.append(item)
+                yield item
+        finally:
+            closed.set()
+
+    async with aclosing(stream_in_thread(items(), maxsize=5)) as stream:
+        async for item in stream:
+            if item == 2:
+                break
+
+    assert await asyncio.to_thread(closed.wait, 5)
+    # The producer never reads more than the buffer ahead of the consumer
+    assert len(produced) <= 3 + 5 + 2
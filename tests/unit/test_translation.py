@@ -0,0 +1,131 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from yt_thumbsense.translation import (
+    LibreTranslateClient,
+    text_hash,
+    translate_to_english,
+    translation_cache,
+)
+
+
+@pytest.fixture()
+def mock_libre_translate():
+    libre_translate = MagicMock()
+    libre_translate.detect_many = AsyncMock(
+        side_effect=lambda texts: [
+            "pt" if "obrigado" in text else "en" for text in texts
+        ]
+    )
+    libre_translate.translate_many = AsyncMock(
+        side_effect=lambda texts, source: ["thank you" for _ in texts]
+    )
+    return libre_translate
+
+
+def test_text_hash_normalizes_text():
+    assert text_hash("  first\n comment ") == text_hash("first comment")
+    assert text_hash("first comment") != text_hash("First comment")
+
+
+@pytest.mark.asyncio
+async def test_translate_to_english(mock_database, mock_libre_translate):
+    translations = await translate_to_english(
+        mock_database, mock_libre_translate, ["lol", "obrigado", "lol "]
+    )
+
+    assert translations == ["lol", "thank you", "lol "]
+    mock_libre_translate.detect_many.assert_called_once_with(["lol", "obrigado"])
+    mock_libre_translate.translate_many.assert_called_once_with(["obrigado"], "pt")
+    assert translation_cache.stats() == {
+        "local_hits": 0,
+        "shared_hits": 0,
+        "misses": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_translate_to_english_local_cache(mock_database, mock_libre_translate):
+    await translate_to_english(mock_database, mock_libre_translate, ["obrigado"])
+    translations = await translate_to_english(
+        mock_database, mock_libre_translate, ["obrigado"]
+    )
+
+    assert translations == ["thank you"]
+    assert mock_libre_translate.translate_many.call_count == 1
+    assert translation_cache.stats()["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_translate_to_english_shared_cache(mock_database, mock_libre_translate):
+    await translate_to_english(mock_database, mock_libre_translate, ["obrigado"])
+    translation_cache.local.clear()
+
+    translations = await translate_to_english(
+        mock_database, mock_libre_translate, ["obrigado"]
+    )
+
+    assert translations == ["thank you"]
+    assert mock_libre_translate.translate_many.call_count == 1
+    assert translation_cache.stats()["shared_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_translate_to_english_failed(mock_database, mock_libre_translate):
+    mock_libre_translate.detect_many.side_effect = None
+    mock_libre_translate.detect_many.return_value = [Exception(), "en"]
+
+    translations = await translate_to_english(
+        mock_database, mock_libre_translate, ["first", "second"]
+    )
+
+    assert translations == [None, "second"]
+    assert await mock_database.translations.count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_libretranslate_client_batches_translations():
+    requests: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        requests.append(payload)
+        if request.url.path == "/detect":
+            return httpx.Response(200, json=[{"language": "pt", "confidence": 90}])
+        return httpx.Response(
+            200, json={"translatedText": [f"en {text}" for text in payload["q"]]}
+        )
+
+    client = LibreTranslateClient(
+        "http://libretranslate",
+        api_key="key",
+        max_batch_size=2,
+        transport=httpx.MockTransport(handler),
+    )
+    try:
+        languages = await client.detect_many(["a", "b"])
+        translations = await client.translate_many(["a", "b", "c"], "pt")
+    finally:
+        await client.close()
+
+    assert languages == ["pt", "pt"]
+    assert translations == ["en a", "en b", "en c"]
+    assert [request["q"] for request in requests[2:]] == [["a", "b"], ["c"]]
+    assert all(request["api_key"] == "key" for request in requests)
+
+
+@pytest.mark.asyncio
+async def test_translate_to_english_local_detection(
+    mock_database, mock_libre_translate
+):
+    translations = await translate_to_english(
+        mock_database,
+        mock_libre_translate,
+        ["this is the best video", "obrigado"],
+    )
+
+    assert translations == ["this is the best video", "thank you"]
+    mock_libre_translate.detect_many.assert_called_once_with(["obrigado"])
@@ -0,0 +1,97 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from yt_thumbsense.config import get_settings
+from yt_thumbsense.utils import (
+    _get_cached_video_validation,
+    _video_validation_cache,
+    is_valid_youtube_video,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_video_validation_cache():
+    _video_validation_cache.clear()
+    yield
+    _video_validation_cache.clear()
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.utils._fetch_youtube_video", return_value=True)
+async def test_is_valid_youtube_video_malformed_id(mock_fetch_youtube_video):
+    assert not await is_valid_youtube_video("abc")
+    assert not await is_valid_youtube_video("A1b2C3d4EfG!")
+
+    mock_fetch_youtube_video.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.utils._fetch_youtube_video", return_value=True)
+async def test_is_valid_youtube_video_cached(mock_fetch_youtube_video):
+    assert await is_valid_youtube_video("A1b2C3d4EfG")
+    assert await is_valid_youtube_video("A1b2C3d4EfG")
+
+    mock_fetch_youtube_video.assert_called_once_with("A1b2C3d4EfG")
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.utils._fetch_youtube_video", return_value=False)
+async def test_is_valid_youtube_video_negative_cached(mock_fetch_youtube_video):
+    assert not await is_valid_youtube_video("A1b2C3d4EfG")
+    assert not await is_valid_youtube_video("A1b2C3d4EfG")
+
+    mock_fetch_youtube_video.assert_called_once_with("A1b2C3d4EfG")
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.utils._fetch_youtube_video", return_value=False)
+async def test_is_valid_youtube_video_known_video(
+    mock_fetch_youtube_video, mock_database, mock_video_data
+):
+    mock_video_data["video_id"] = "A1b2C3d4EfG"
+    await mock_database.videos.insert_one(mock_video_data)
+
+    assert await is_valid_youtube_video("A1b2C3d4EfG", mock_database)
+
+    mock_fetch_youtube_video.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.utils.redis_conn")
+@patch("yt_thumbsense.utils._video_validation_cache")
+async def test_redis_negative_validation_keeps_negative_ttl(
+    mock_cache, mock_redis_conn
+):
+    mock_cache.get.return_value = None
+    mock_redis_conn.get.return_value = b"0"
+    settings = get_settings().model_copy(
+        update={"youtube_validation_cache_redis": True}
+    )
+
+    with patch("yt_thumbsense.utils.settings", settings):
+        assert await _get_cached_video_validation("A1b2C3d4EfG") is False
+
+    mock_cache.set.assert_called_once_with(
+        "A1b2C3d4EfG",
+        False,
+        ttl=settings.youtube_validation_negative_cache_ttl_seconds,
+    )
+
+
+@pytest.mark.asyncio
+@patch("yt_thumbsense.utils.redis_conn")
+async def test_redis_validation_cache_runs_off_the_event_loop(mock_redis_conn):
+    threads = []
+    mock_redis_conn.get.side_effect = lambda key: threads.append(
+        threading.current_thread()
+    )
+    settings = get_settings().model_copy(
+        update={"youtube_validation_cache_redis": True}
+    )
+
+    with patch("yt_thumbsense.utils.settings", settings):
+        assert await _get_cached_video_validation("A1b2C3d4EfG") is None
+
+    assert threads and threads[0] is not threading.current_thread()
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from rq.timeouts import JobTimeoutException, UnixSignalDeathPenalty
+
+from yt_thumbsense.worker import (
+    ConcurrentWorker,
+    ThumbsenseJob,
+    get_event_loop,
+    redis_conn,
+)
+
+
+async def running_loop():
+    return asyncio.get_running_loop()
+
+
+def test_thumbsense_job_reuses_event_loop():
+    first_job = ThumbsenseJob.create(running_loop, connection=redis_conn)
+    second_job = ThumbsenseJob.create(running_loop, connection=redis_conn)
+
+    assert first_job._execute() is second_job._execute() is get_event_loop()
+
+
+@pytest.fixture
+def threaded_event_loop():
+    loop = get_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever)
+    loop_thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    loop_thread.join()
+
+
+def test_thumbsense_job_runs_on_threaded_event_loop(threaded_event_loop):
+    job = ThumbsenseJob.create(running_loop, connection=redis_conn)
+
+    assert job._execute() is threaded_event_loop
+
+
+def test_thumbsense_job_timeout_on_threaded_event_loop(threaded_event_loop):
+    job = ThumbsenseJob.create(asyncio.sleep, args=(1,), connection=redis_conn)
+    job.timeout = 0.01
+
+    with pytest.raises(JobTimeoutException):
+        job._execute()
+
+
+cancelled = threading.Event()
+
+
+async def cancellable_sleep():
+    try:
+        await asyncio.sleep(10)
+    except asyncio.CancelledError:
+        cancelled.set()
+        raise
+
+
+def test_thumbsense_job_signal_timeout_cancels_task():
+    cancelled.clear()
+    job = ThumbsenseJob.create(cancellable_sleep, connection=redis_conn)
+    job.timeout = 60
+
+    # The timeout of the SimpleWorker path, raised from a SIGALRM handler
+    with pytest.raises(JobTimeoutException):
+        with UnixSignalDeathPenalty(1, JobTimeoutException, job_id=job.id):
+            job._execute()
+
+    assert cancelled.is_set()
+    assert not asyncio.all_tasks(get_event_loop())
+
+
+def test_concurrent_worker_runs_jobs_concurrently():
+    connection = MagicMock()
+    connection.connection_pool.connection_kwargs = {}
+    worker = ConcurrentWorker(
+        ["main"], connection=connection, job_class=ThumbsenseJob, max_concurrent_jobs=2
+    )
+    both_jobs_started = threading.Barrier(2, timeout=1)
+
+    with (
+        patch.object(worker, "prepare_execution"),
+        patch.object(
+            worker,
+            "perform_job",
+            side_effect=lambda job, queue: both_jobs_started.wait(),
+        ) as mock_perform_job,
+    ):
+        for _ in range(2):
+            assert worker._job_slots.acquire(blocking=False)
+            worker.execute_job(MagicMock(), MagicMock())
+        worker._executor.shutdown(wait=True)
+
+    assert mock_perform_job.call_count == 2
+    assert not both_jobs_started.broken
+    # Both slots were released
+    assert worker._job_slots.acquire(blocking=False)
+    assert worker._job_slots.acquire(blocking=False)
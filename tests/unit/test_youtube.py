@@ -0,0 +1,136 @@
+import json as json_module
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from youtube_comment_downloader import SORT_BY_POPULAR
+
+from yt_thumbsense.youtube import CHECKPOINT_KEY, ResumableCommentDownloader
+
+# Responses of YouTube for a video with two pages of comments and a reply
+RESPONSES = Path(__file__).parent / "data" / "youtube"
+
+
+def recorded_response(url, params=None, json=None):
+    response = MagicMock(url=url, status_code=200)
+    if json is None:
+        response.text = (RESPONSES / "watch.html").read_text()
+    else:
+        token = json["continuation"]
+        response.json.side_effect = lambda: json_module.loads(
+            (RESPONSES / f"next_{token}.json").read_text()
+        )
+    return response
+
+
+def recorded_downloader() -> ResumableCommentDownloader:
+    downloader = ResumableCommentDownloader()
+    downloader.session = MagicMock()
+    downloader.session.get.side_effect = recorded_response
+    downloader.session.post.side_effect = recorded_response
+    return downloader
+
+
+@pytest.fixture
+def downloader():
+    return recorded_downloader()
+
+
+def requested_tokens(downloader) -> list[str]:
+    return [
+        call.kwargs["json"]["continuation"]
+        for call in downloader.session.post.call_args_list
+    ]
+
+
+def test_resumable_comment_downloader(downloader):
+    comments = list(
+        downloader.get_comments("A1b2C3d4EfG", sort_by=SORT_BY_POPULAR, sleep=0)
+    )
+
+    assert [comment["cid"] for comment in comments] == [
+        "UgzA",
+        "UgzB",
+        "UgzB.r1",
+        "UgzC",
+    ]
+    assert requested_tokens(downloader) == ["top", "replies_UgzB", "page_2"]
+    # The comments are parsed by YoutubeCommentDownloader
+    assert comments[0]["votes"] == "1.2K"
+    assert comments[0]["heart"] is True
+    assert comments[1]["votes"] == "0"
+    assert comments[2]["reply"] is True
+    assert comments[3]["paid"] == "€5.00"
+    assert all("time_parsed" in comment for comment in comments)
+    assert CHECKPOINT_KEY not in comments[0]
+    # The checkpoint of a page points at the next ones, with only what they need
+    assert comments[1][CHECKPOINT_KEY] == {
+        "continuations": [
+            {
+                "commandMetadata": {
+                    "webCommandMetadata": {"apiUrl": "/youtubei/v1/next"}
+                },
+                "continuationCommand": {"token": token},
+            }
+            for token in ["page_2", "replies_UgzB"]
+        ],
+    }
+    assert comments[3][CHECKPOINT_KEY] == {"continuations": []}
+
+
+def test_resumable_comment_downloader_resumes(downloader):
+    first_pages = list(
+        downloader.get_comments("A1b2C3d4EfG", sort_by=SORT_BY_POPULAR, sleep=0)
+    )
+    resumed_downloader = recorded_downloader()
+
+    resumed = list(
+        resumed_downloader.get_comments(
+            "A1b2C3d4EfG",
+            sort_by=SORT_BY_POPULAR,
+            checkpoint=first_pages[1][CHECKPOINT_KEY],
+            sleep=0,
+        )
+    )
+
+    assert [comment["cid"] for comment in resumed] == ["UgzB.r1", "UgzC"]
+    # The first pages aren't requested again
+    assert requested_tokens(resumed_downloader) == ["replies_UgzB", "page_2"]
+    assert resumed[0][CHECKPOINT_KEY] == first_pages[2][CHECKPOINT_KEY]
+
+
+def test_resumable_comment_downloader_resumes_after_last_page(downloader):
+    comments = list(
+        downloader.get_comments(
+            "A1b2C3d4EfG",
+            sort_by=SORT_BY_POPULAR,
+            checkpoint={"continuations": []},
+            sleep=0,
+        )
+    )
+
+    assert comments == []
+    downloader.session.post.assert_not_called()
+
+
+def test_resumable_comment_downloader_checkpoints_failed_page(downloader):
+    def failing_response(url, params=None, json=None):
+        if json is not None and json["continuation"] == "page_2":
+            raise ConnectionError
+        return recorded_response(url, params, json)
+
+    downloader.session.post.side_effect = failing_response
+    comments = []
+
+    with pytest.raises(ConnectionError):
+        for comment in downloader.get_comments(
+            "A1b2C3d4EfG", sort_by=SORT_BY_POPULAR, sleep=0
+        ):
+            comments.append(comment)
+
+    assert [comment["cid"] for comment in comments] == ["UgzA", "UgzB", "UgzB.r1"]
+    # The page that failed is requested again on resume
+    assert [
+        continuation["continuationCommand"]["token"]
+        for continuation in comments[-1][CHECKPOINT_KEY]["continuations"]
+    ] == ["page_2"]